@@ -0,0 +1,184 @@
+# ./pathfinding/benchmark.py
+
+import argparse
+import csv
+import gc
+import json
+import sys
+import time
+import tracemalloc
+import numpy
+from src import *
+from src.wavefront_bfs import wavefront
+from src.components import label_components, NO_COMPONENT
+
+BD = BoardOptions()
+
+SEARCHES = {
+    'Astar': Astar, 'BFS': BFS, 'DFS': DFS,
+    'BidirectionalAstar': BidirectionalAstar, 'BidirectionalBFS': BidirectionalBFS,
+    'FastAstar': FastAstar, 'BucketAstar': BucketAstar, 'JPS': JPS, 'WavefrontBFS': WavefrontBFS,
+}
+GENERATORS = {
+    'RandomPrim': lambda board, seed: RandomPrim(board).prims(),
+    'RandomDepthFirst': lambda board, seed: RandomDepthFirst(board).depth(),
+    'FastPrim': lambda board, seed: FastPrim(board, numpy.random.default_rng(seed)).prims(),
+    'FastDepthFirst': lambda board, seed: FastDepthFirst(board, numpy.random.default_rng(seed)).depth(),
+}
+# generators the search boards are carved with, by their board name
+MAZES = {'prim': 'FastPrim', 'depth': 'FastDepthFirst'}
+
+DEFAULT_SIZES = (32, 64, 128)
+DEFAULT_DENSITIES = (0.1, 0.25, 0.35)
+DEFAULT_THRESHOLD = 1.1
+FIELDS = ('kind', 'algorithm', 'board', 'size', 'density', 'seconds', 'expanded', 'length', 'peak_bytes')
+
+def make_board(kind: str, size: int, density: float, seed: int) -> Board:
+    '''
+    returns a size x size board of random walls at density or a maze
+    carved by the generator of MAZES[kind]
+    '''
+    board = Board(size, size)
+    if kind == 'random':
+        rng = numpy.random.default_rng(seed)
+        board.set_rows(0, (rng.random((size, size)) < density).astype(numpy.int8) * BD.wall)
+    else:
+        GENERATORS[MAZES[kind]](board, seed)
+    return board
+
+def endpoints(board: Board) -> tuple:
+    '''
+    returns (start, goal) in the largest component of the board, the
+    first cell of the component and the cell farthest from it, or None
+    when the component is a single cell
+    '''
+    passable = board.view() != BD.wall
+    if not passable.any():
+        return None
+    labels = label_components(passable)
+    largest = numpy.bincount(labels[labels != NO_COMPONENT]).argmax()
+    start = tuple(int(i) for i in numpy.unravel_index(largest, passable.shape))
+    distance = wavefront(passable, start)
+    goal = tuple(int(i) for i in numpy.unravel_index(numpy.argmax(distance), distance.shape))
+    return None if start == goal else (start, goal)
+
+def measure(run, memory: bool, repeat: int) -> tuple:
+    '''
+    returns (best seconds of repeat runs, peak traced bytes, last result),
+    the peak comes from an extra traced run so it doesn't skew timings
+    '''
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - t)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak, result
+
+def run_suite(sizes, densities, boards, searches, generators, repeat: int = 3,
+              memory: bool = True, seed: int = 0) -> list:
+    '''
+    Returns a list of result dicts with FIELDS for every generator and
+    size and for every search, board kind, size and density
+    '''
+    results = []
+    for name in generators:
+        for size in sizes:
+            def generate():
+                board = Board(size, size)
+                GENERATORS[name](board, seed)
+                return board
+            seconds, peak, _ = measure(generate, memory, repeat)
+            results.append(dict(kind='generate', algorithm=name, board='maze', size=size, density=None,
+                                seconds=seconds, expanded=None, length=None, peak_bytes=peak))
+
+    for kind in boards:
+        for size in sizes:
+            for density in (densities if kind == 'random' else (None,)):
+                board = make_board(kind, size, density, seed)
+                pair = endpoints(board)
+                if pair is None:
+                    print(f"{'skipped':>20} {kind:>6} {size:>5} {'' if density is None else density:>5} "
+                          f"no two connected cells", file=sys.stderr)
+                    continue
+                start, goal = pair
+                for name in searches:
+                    run = lambda: search(SEARCHES[name], board, start, goal)
+                    seconds, peak, result = measure(run, memory, repeat)
+                    results.append(dict(kind='search', algorithm=name, board=kind, size=size, density=density,
+                                        seconds=seconds, expanded=result.expanded,
+                                        length=len(result), peak_bytes=peak))
+                    print(f"{name:>20} {kind:>6} {size:>5} {'' if density is None else density:>5} "
+                          f"{seconds * 1000:10.2f}ms expanded {result.expanded} length {len(result)}",
+                          file=sys.stderr)
+    return results
+
+def key(result: dict) -> tuple:
+    return (result['kind'], result['algorithm'], result['board'], result['size'], result['density'])
+
+def compare(results: list, baseline: list, threshold: float = DEFAULT_THRESHOLD) -> list:
+    '''
+    Prints the time and expansion ratios of results against a baseline,
+    returns the results slower than threshold times their baseline
+    '''
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        ratio = result['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        expanded = ''
+        if result['expanded'] is not None and old['expanded']:
+            expanded = f" expanded x{result['expanded'] / old['expanded']:.2f}"
+        flag = ' REGRESSION' if ratio > threshold else ''
+        print(f"{' '.join(str(part) for part in key(result) if part is not None)}: "
+              f"time x{ratio:.2f}{expanded}{flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+def write_csv(results: list, path: str) -> None:
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark the search and maze generation algorithms')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--densities', type=float, nargs='+', default=DEFAULT_DENSITIES)
+    parser.add_argument('--boards', nargs='+', default=['random', *MAZES], choices=['random', *MAZES])
+    parser.add_argument('--searches', nargs='+', default=list(SEARCHES), choices=list(SEARCHES))
+    parser.add_argument('--generators', nargs='+', default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc runs')
+    parser.add_argument('--json', help='write the results as JSON')
+    parser.add_argument('--csv', help='write the results as CSV')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='time ratio above which a result is a regression')
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.densities, args.boards, args.searches, args.generators,
+                        args.repeat, not args.no_memory, args.seed)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=1)
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        sys.exit(1 if regressions else 0)
+    elif not args.json and not args.csv:
+        json.dump(results, sys.stdout, indent=1)
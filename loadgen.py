@@ -0,0 +1,119 @@
+# ./pathfinding/loadgen.py
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import numpy
+from src import *
+from src.service import PathService, serve, DEFAULT_BATCH_WINDOW
+
+BD = BoardOptions()
+
+async def naive_handle(board: Board, reader, writer) -> None:
+    '''
+    one query per call, every line runs a blocking Astar on the event loop
+    '''
+    while line := await reader.readline():
+        message = json.loads(line)
+        response = {'id': message['id']}
+        try:
+            response['path'] = Astar(board, tuple(message['start']), tuple(message['goal'])).solve().path.tolist()
+        except PathNotFound:
+            response['error'] = 'PathNotFound'
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+    writer.close()
+
+async def client(connect, queries: list, latencies: list) -> None:
+    '''
+    sends queries one after another on its own connection
+    '''
+    reader, writer = await connect()
+    for number, (start, goal) in enumerate(queries):
+        t = time.perf_counter()
+        writer.write(json.dumps({'id': number, 'start': start, 'goal': goal}).encode() + b'\n')
+        await writer.drain()
+        json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - t)
+    writer.close()
+
+async def load(connect, queries: list, concurrency: int) -> dict:
+    '''
+    Returns requests per second and latency percentiles of concurrency
+    clients splitting queries between them
+    '''
+    latencies = []
+    t = time.perf_counter()
+    await asyncio.gather(*(client(connect, queries[i::concurrency], latencies) for i in range(concurrency)))
+    seconds = time.perf_counter() - t
+    latencies = numpy.array(latencies) * 1000
+    return dict(requests=len(queries), seconds=seconds, rps=len(queries) / seconds,
+                **{f'p{p}_ms': float(numpy.percentile(latencies, p)) for p in (50, 90, 99)})
+
+def make_queries(board: Board, count: int, unique: int, seed: int) -> list:
+    '''
+    returns count (start, goal) queries drawn from unique random pairs
+    of passable cells
+    '''
+    rng = random.Random(seed)
+    cells = numpy.argwhere(board.view() != BD.wall).tolist()
+    pairs = [(rng.choice(cells), rng.choice(cells)) for _ in range(unique)]
+    return [rng.choice(pairs) for _ in range(count)]
+
+def report(name: str, result: dict) -> None:
+    print(f"{name:>10}: {result['rps']:8.1f} req/s  p50 {result['p50_ms']:.2f}ms  "
+          f"p90 {result['p90_ms']:.2f}ms  p99 {result['p99_ms']:.2f}ms")
+
+async def main(args) -> None:
+    if args.socket or args.port:
+        board = load_board(args.board) if args.board else None
+        assert board is not None, 'loadgen: --board is needed to draw queries for a running service'
+        connect = (lambda: asyncio.open_unix_connection(args.socket)) if args.socket else \
+                  (lambda: asyncio.open_connection(args.host, args.port))
+        report('service', await load(connect, make_queries(board, args.requests, args.unique, args.seed),
+                                     args.concurrency))
+        return
+
+    # no running service given, compare both in process on Unix sockets
+    if args.board:
+        board = load_board(args.board)
+    else:
+        board = Board(args.size, args.size)
+        FastPrim(board, numpy.random.default_rng(args.seed)).prims()
+    queries = make_queries(board, args.requests, args.unique, args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'naive.sock')
+        server = await asyncio.start_unix_server(lambda reader, writer: naive_handle(board, reader, writer), path)
+        async with server:
+            report('per call', await load(lambda: asyncio.open_unix_connection(path),
+                                          queries[:args.naive_requests], args.concurrency))
+
+        path = os.path.join(directory, 'service.sock')
+        async with PathService(board, args.workers, batch_window=args.batch_window) as service:
+            server = await serve(service, path)
+            async with server:
+                report('batched', await load(lambda: asyncio.open_unix_connection(path), queries, args.concurrency))
+            stats = service.stats()
+            print(f"{'':>10}  {stats['batches']} batches of {stats['mean_batch']:.1f}, "
+                  f"{stats['coalesced']} coalesced of {stats['requests']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='measure requests per second of the path query service')
+    parser.add_argument('--board', help='a board saved with save_board, a FastPrim maze otherwise')
+    parser.add_argument('--size', type=int, default=201)
+    parser.add_argument('--socket', help='Unix socket of a running service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='TCP port of a running service')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--naive-requests', type=int, default=200, help='requests sent to the per call server')
+    parser.add_argument('--unique', type=int, default=500, help='distinct queries the requests are drawn from')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-window', type=float, default=DEFAULT_BATCH_WINDOW)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
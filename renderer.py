@@ -0,0 +1,137 @@
+# ./pathfinding/renderer.py
+
+import time
+import numpy
+import pygame
+from src import Board, BoardOptions
+
+# dirty cells kept before a frame falls back to repainting every cell
+_MAX_DIRTY = 4096
+_CAPTION_EVERY = 30
+
+class Renderer:
+    '''
+    Draws a board by mapping its values through a color lookup table into
+    a surface holding one pixel per cell, which is scaled onto the screen.
+    Only cells changed through the board since the last frame are repainted.
+    Overlays color cells on top of the board without touching it
+    '''
+
+    def __init__(self, board: Board, colors: dict, caption: str = 'Visualizer') -> None:
+        self._board = board
+        self.caption = caption
+        self._lut = numpy.zeros((256, 3), numpy.uint8)
+        for value, color in colors.items():
+            self._lut[value & 0xFF] = (color.r, color.g, color.b)
+        self._cells = None
+        self._dirty = []
+        self._full = True
+        self._overlays = {}
+        self.frame_time = 0.0
+        self.fps = 0.0
+        self._clock = pygame.time.Clock()
+        self._frames = 0
+        board.watch(self._on_change)
+
+    def close(self) -> None:
+        self._board.unwatch(self._on_change)
+
+    def _on_change(self, board: Board, cells) -> None:
+        if cells is None or self._full or len(self._dirty) + len(cells) > _MAX_DIRTY:
+            self._full = True
+            self._dirty = []
+        else:
+            self._dirty.extend(cells)
+
+    def set_overlay(self, name: str, cells, value: int) -> None:
+        '''
+        Draws the (N, 2) array of (row, col) cells in the color of value
+        over the board until the overlay called name is replaced or cleared,
+        overlays are drawn in the order they were first set
+        '''
+        cells = numpy.asarray(cells, numpy.intp).reshape(-1, 2)
+        if name in self._overlays:
+            self._on_change(self._board, self._overlays[name][0].tolist())
+        self._overlays[name] = (cells, value)
+        self._on_change(self._board, cells.tolist())
+
+    def clear_overlays(self) -> None:
+        for cells, _ in self._overlays.values():
+            self._on_change(self._board, cells.tolist())
+        self._overlays = {}
+
+    def _offset(self) -> int:
+        '''
+        the width of the border ring drawn around the usable cells
+        '''
+        return (self._board.actual_size()[0] - self._board.size()[0]) // 2
+
+    def _paint(self) -> None:
+        '''
+        brings the cell surface up to date with the board
+        '''
+        rows, cols = self._board.actual_size()
+        if self._cells is None or self._cells.get_size() != (cols, rows):
+            self._cells = pygame.Surface((cols, rows))
+            self._full = True
+        offset = self._offset()
+        values = self._board.view().view(numpy.uint8)
+        pixels = pygame.surfarray.pixels3d(self._cells)
+        if self._full:
+            # surfarray arrays are indexed [x, y]
+            pixels[...] = self._lut[BoardOptions().wall & 0xFF]
+            pixels[offset:offset + values.shape[1], offset:offset + values.shape[0]] = self._lut[values.T]
+        elif self._dirty:
+            cells = numpy.array(self._dirty, numpy.intp)
+            pixels[cells[:, 1] + offset, cells[:, 0] + offset] = self._lut[values[cells[:, 0], cells[:, 1]]]
+        for cells, value in self._overlays.values():
+            pixels[cells[:, 1] + offset, cells[:, 0] + offset] = self._lut[value & 0xFF]
+        del pixels
+        self._full = False
+        self._dirty = []
+
+    def draw(self, surface, size: tuple) -> pygame.Rect:
+        '''
+        Draws the board scaled to size, (width, height), at the top left
+        of surface and returns the rect drawn
+        '''
+        t = time.perf_counter()
+        self._paint()
+        rect = surface.blit(pygame.transform.scale(self._cells, (int(size[0]), int(size[1]))), (0, 0))
+        self.frame_time = time.perf_counter() - t
+        return rect
+
+    def tick(self) -> None:
+        '''
+        Counts a displayed frame and shows the frame rate and the time
+        of the last draw in the window caption
+        '''
+        self._clock.tick()
+        self._frames += 1
+        if self._frames % _CAPTION_EVERY == 0:
+            self.fps = self._clock.get_fps()
+            pygame.display.set_caption(f'{self.caption} - {self.fps:.0f} fps, draw {self.frame_time * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    # frames per second on a large board with a few cells changing per frame
+    import os
+    import random
+    from src import FastPrim
+    from visualizer import COLORS
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    surface = pygame.display.set_mode((1000, 1000))
+    board = Board(500, 500, True)
+    FastPrim(board, numpy.random.default_rng(0)).prims()
+    renderer = Renderer(board, COLORS)
+    t = time.perf_counter()
+    for frame in range(200):
+        for _ in range(10):
+            board[random.randrange(500), random.randrange(500)] = BoardOptions().route
+        renderer.draw(surface, (1000, 1000))
+        pygame.display.update()
+        renderer.tick()
+    print(f'500x500 at 1000x1000: {200 / (time.perf_counter() - t):.0f} fps')
+    pygame.quit()
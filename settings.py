@@ -5,5 +5,8 @@ settings = {
         'rows': 50,
         'cols': 50
     },
-    'multiplier': 10
+    'multiplier': 10,
+    # frame rate cap and the seconds of algorithm work done per frame
+    'fps': 60,
+    'step_budget': 0.008
 }
\ No newline at end of file
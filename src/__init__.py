@@ -1,9 +1,30 @@
 # .pathfinding/src/__init__.py
 
-from .board import Board, BoardOptions
+from .board import Board, BoardOptions, Passability
+from .board_io import BoardReader, BoardWriter, save_board, load_board
+from .graph import CompiledGraph, compile_board
+from .components import ComponentIndex, component_index, connected
 from .astar_main import Astar
+from .fast_astar import FastAstar
+from .bucket_astar import BucketAstar
+from .jump_point_search import JPS
 from .breadth_first_search import BFS
+from .wavefront_bfs import WavefrontBFS
 from .depth_first_search import DFS
+from .bidirectional import BidirectionalBFS, BidirectionalAstar
 from .rand_prim import RandomPrim
+from .fast_prim import FastPrim
 from .randomized_depth_first import RandomDepthFirst
+from .fast_depth_first import FastDepthFirst
+from .eller import Eller
+from .dataset import generate_dataset, load_shard, DatasetReport
+from .planner import is_uniform, choose_engine, find_path
+from .batch import BatchPlanner
+from .service import PathService, serve
+from .distance_field import DistanceField, DistanceFieldCache
+from .result import SearchResult, search
+from .path_cache import PathCache, CacheStats
+from .dstar_lite import DStarLite
+from .hierarchical import HierarchicalPlanner
+from .stats import Stats, collect, add_sink, remove_sink
 from .errors import *
\ No newline at end of file
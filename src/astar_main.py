@@ -2,26 +2,40 @@
 from queue import PriorityQueue
 from collections import defaultdict
 from .board import Board, BoardOptions
+from .graph import CompiledGraph
 from .errors import PathNotFound
+from .steps import DEFAULT_BATCH, changed, run
+from .result import SearchResult
+from . import stats as instrument
+from . import components
 
 class Astar: 
 
-    def __init__(self, board: Board, start: tuple, goal: tuple) -> None:
+    def __init__(self, board: Board, start: tuple, goal: tuple, graph: CompiledGraph = None) -> None:
         self._board = board
         self.start = start
         self.goal = goal
+        self._graph = graph
+        self.expanded = 0
+        self._paint = True
 
     def reconstruct_path(self, cameFrom: dict, current: set) -> dict:
         '''
         Given a dictionary of paths and a current value returns a set
-        of the reconstruced path from its origin
+        of the reconstruced path from its origin, the ordered path is
+        kept in self.path, the route is marked on the board unless
+        run by solve
         '''
         total_path = {current}
+        self.path = [current]
         while current in cameFrom:
             current = cameFrom[current]
             total_path.add(current)
-            self._board[current] = BoardOptions().route if self._board[current] == BoardOptions().path else int(self._board[current])
+            self.path.append(current)
+            if self._paint:
+                self._board[current] = BoardOptions().route if self._board[current] == BoardOptions().path else int(self._board[current])
 
+        self.path.reverse()
         return total_path
 
     def is_valid(self,row: int, col: int) -> bool:
@@ -38,10 +52,21 @@ class Astar:
         '''
         #rows = [-1,0,0,1,1,-1,1,-1]
         #cols = [0,-1,1,0,1,-1,-1,1]
+        if self._graph is not None:
+            return self._graph.neighbors(row, col)
         rows = [-1,0,0,1]
         cols = [0,-1,1,0]
         return ((row + rows[i], col + cols[i]) for i in range(len(rows)) if self.is_valid(row + rows[i], col + cols[i]))
 
+    def edges(self, row: int, col: int) -> tuple:
+        '''
+        returns a tuple generator of (neighbor, cost) for the
+        neighbors of the given int/row
+        '''
+        if self._graph is not None:
+            return self._graph.edges(row, col)
+        return ((neighbor, 1 + int(self._board[neighbor])) for neighbor in self.neighbors(row, col))
+
     def h(self,x1: int, y1: int, x2: int, y2: int) -> int:
         '''
         heuristic function (Manhattan distance)
@@ -54,6 +79,30 @@ class Astar:
         Astar pathfinding algorithm on the grid given,
         finds the optimal path
         '''
+        return run(self.steps(0))
+
+    def solve(self) -> SearchResult:
+        '''
+        Runs astar without touching the board and returns the
+        SearchResult of its path, raises PathNotFound if there is none
+        '''
+        self._paint = False
+        try:
+            run(self.steps(0))
+        finally:
+            self._paint = True
+        return SearchResult.from_path(self._board, self.path, type(self).__name__, self.expanded)
+
+    def steps(self, batch: int = DEFAULT_BATCH):
+        '''
+        Astar as a generator yielding an (N, 2) array of the cells expanded
+        every batch expansions and finally the cells of the route, returns
+        what astar returns. batch 0 yields only the route
+        '''
+        if self._graph is None and not components.connected(self._board, self.start, self.goal):
+            raise PathNotFound
+        stats = instrument.begin(self)
+        self.expanded = 0
         open_set = PriorityQueue()
         open_set.put((0, self.start))
         
@@ -65,15 +114,34 @@ class Astar:
 
         fScore = defaultdict(lambda: float('inf'))
         fScore[self.start] = self.h(*self.start, *self.goal)
+        expanded = []
 
         while not open_set.empty():
             current = open_set.get()[1]
+            if stats is not None:
+                stats.pops += 1
             
             if current == self.goal:
-                return self.reconstruct_path(came_from, current)
+                if expanded:
+                    yield changed(expanded)
+                if stats is not None:
+                    instrument.lap(stats, 'search')
+                total_path = self.reconstruct_path(came_from, current)
+                if stats is not None:
+                    self._finish(stats, 'reconstruct_path')
+                yield changed(self.path)
+                return total_path
             open_set_hash.remove(current)
-            for neighbor in self.neighbors(*current):
-                tentative_Gscore = gScore[current] + 1 + self._board[neighbor]
+            self.expanded += 1
+            if batch:
+                expanded.append(current)
+                if len(expanded) >= batch:
+                    yield changed(expanded)
+                    expanded = []
+            for neighbor, cost in self.edges(*current):
+                if stats is not None:
+                    stats.neighbors += 1
+                tentative_Gscore = gScore[current] + cost
                 if tentative_Gscore < gScore[neighbor]:
                     came_from[neighbor] = current
                     gScore[neighbor] = tentative_Gscore
@@ -81,6 +149,23 @@ class Astar:
                     if neighbor not in open_set_hash:
                         open_set_hash.add(neighbor)
                         open_set.put((fScore[neighbor],neighbor))
+                        if stats is not None:
+                            stats.pushes += 1
+                    elif stats is not None:
+                        # already queued, its better score is not pushed again
+                        stats.duplicate_pushes += 1
                         
 
-        raise PathNotFound
\ No newline at end of file
+        if stats is not None:
+            self._finish(stats, 'search')
+        raise PathNotFound
+
+    def _finish(self, stats, phase: str) -> None:
+        '''
+        closes the last phase of an instrumented run and reports it
+        '''
+        instrument.lap(stats, phase)
+        stats.expanded = self.expanded
+        # the start is queued before the loop
+        stats.pushes += 1
+        instrument.end(stats)
\ No newline at end of file
@@ -0,0 +1,180 @@
+# .pathfinding/src/batch.py
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+import numpy
+from .board import Board
+from .errors import PathNotFound
+from .planner import find_path
+
+DEFAULT_CHUNKSIZE = 64
+
+# set in each worker process by _attach
+_worker = {}
+
+def _attach(name: str, shape: tuple) -> None:
+    '''
+    worker initializer, attaches the shared board once per process
+    '''
+    shm = shared_memory.SharedMemory(name=name)
+    _worker['shm'] = shm
+    _worker['array'] = numpy.ndarray(shape, numpy.int8, buffer=shm.buf)
+    _worker['version'] = None
+
+def _attach_memmap(filename: str, border: bool) -> None:
+    '''
+    worker initializer for memory mapped boards, maps the board's
+    file read-only so workers share the page cache instead of a copy
+    '''
+    _worker['array'] = Board.open_memmap(filename, border, mode='r').view()
+    _worker['version'] = None
+
+def _solve_chunk(version: int, pairs: numpy.ndarray, engine) -> list:
+    '''
+    solves a chunk of (start_row, start_col, goal_row, goal_col) pairs
+    on the shared board, returns a list of (N, 2) int32 paths with None
+    where no path exists
+    '''
+    if _worker['version'] != version:
+        # the shared copy was refreshed, drop caches built on the old one
+        _worker['board'] = Board.wrap(_worker['array'])
+        _worker['version'] = version
+    board = _worker['board']
+    paths = []
+    for start_row, start_col, goal_row, goal_col in pairs.tolist():
+        try:
+            if engine is None:
+                path = find_path(board, (start_row, start_col), (goal_row, goal_col))
+            else:
+                path = engine(board, (start_row, start_col), (goal_row, goal_col)).search()
+            paths.append(numpy.array(path, numpy.int32))
+        except PathNotFound:
+            paths.append(None)
+    return paths
+
+
+class BatchPlanner:
+    '''
+    Solves many (start, goal) queries against one board on a process pool
+    without touching the board. Workers read a shared memory copy of the
+    usable board which is refreshed whenever the board's version changes,
+    boards backed by a memory map are flushed and mapped by the workers.
+    engine is a class with a non-mutating search() such as FastAstar, JPS
+    or WavefrontBFS, by default planner.find_path picks one per query
+    '''
+
+    def __init__(self, board: Board, workers: int = None, engine = None) -> None:
+        self._board = board
+        self.workers = workers
+        self.engine = engine
+        self._shm = None
+        self._executor = None
+        self._version = None
+        # chunks submitted and maybe still reading the shared copy
+        self._running = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start(self) -> None:
+        '''
+        creates the shared copy of the board and the worker pool
+        '''
+        if self._board.filename is not None:
+            self._sync()
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_attach_memmap,
+                                                 initargs=(self._board.filename, self._board._border))
+            return
+        values = self._board.view()
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+        self._shared = numpy.ndarray(values.shape, numpy.int8, buffer=self._shm.buf)
+        self._sync()
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_attach,
+                                             initargs=(self._shm.name, values.shape))
+
+    def close(self) -> None:
+        '''
+        shuts the worker pool down and frees the shared board
+        '''
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._shm is not None:
+            del self._shared
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _sync(self) -> None:
+        if self._version != self._board.version:
+            # chunks of earlier calls still read the old copy, it is only refreshed after them
+            wait(self._running)
+            self._running = []
+            if self._shm is None:
+                self._board.flush()
+            else:
+                self._shared[...] = self._board.view()
+            self._version = self._board.version
+
+    def iter_chunks(self, pairs, chunksize: int = DEFAULT_CHUNKSIZE):
+        '''
+        Given an array-like of (start_row, start_col, goal_row, goal_col)
+        returns an iterator of (offset, paths) for consecutive chunks of the
+        queries in order, paths being (N, 2) int32 arrays with None where no
+        path exists. The board is read and the chunks submitted by the call
+        itself, so edits made afterwards don't reach these queries
+        '''
+        assert self._executor is not None, 'BatchPlanner.iter_chunks: planner is not started'
+        pairs = numpy.asarray(pairs, numpy.int32).reshape(-1, 4)
+        self._sync()
+        offsets = range(0, len(pairs), chunksize)
+        futures = [self._executor.submit(_solve_chunk, self._version, pairs[i:i + chunksize], self.engine)
+                   for i in offsets]
+        self._running = [future for future in self._running if not future.done()] + futures
+        return ((offset, future.result()) for offset, future in zip(offsets, futures))
+
+    def solve(self, pairs, chunksize: int = DEFAULT_CHUNKSIZE) -> list:
+        '''
+        Returns the list of paths for every (start_row, start_col, goal_row,
+        goal_col) query in pairs
+        '''
+        paths = []
+        for _, chunk in self.iter_chunks(pairs, chunksize):
+            paths.extend(chunk)
+        return paths
+
+
+if __name__ == '__main__':
+    # throughput against serial loops on a maze
+    import os
+    import random
+    import time
+    from .board import BoardOptions
+    from .astar_main import Astar
+    from .rand_prim import RandomPrim
+
+    random.seed(0)
+    board = Board(120, 120)
+    RandomPrim(board).prims()
+    cells = [tuple(cell) for cell in numpy.argwhere(board.view() == BoardOptions().path).tolist()]
+    pairs = [(*random.choice(cells), *random.choice(cells)) for _ in range(400)]
+
+    t = time.perf_counter()
+    for start_row, start_col, goal_row, goal_col in pairs[:40]:
+        Astar(board, (start_row, start_col), (goal_row, goal_col)).astar()
+        board.replace(BoardOptions().route, BoardOptions().path)
+    print(f'serial Astar: {40 / (time.perf_counter() - t):.1f} queries/s')
+
+    t = time.perf_counter()
+    for start_row, start_col, goal_row, goal_col in pairs:
+        find_path(board, (start_row, start_col), (goal_row, goal_col))
+    print(f'serial find_path: {len(pairs) / (time.perf_counter() - t):.1f} queries/s')
+
+    with BatchPlanner(board) as planner:
+        planner.solve(pairs[:os.cpu_count()], chunksize=1)
+        t = time.perf_counter()
+        paths = planner.solve(pairs, chunksize=16)
+        print(f'BatchPlanner ({os.cpu_count()} workers): {len(pairs) / (time.perf_counter() - t):.1f} queries/s')
@@ -0,0 +1,212 @@
+# .pathfinding/src/bidirectional.py
+import heapq
+from .board import Board, BoardOptions
+from .astar_main import Astar
+from .breadth_first_search import BFS
+from .errors import PathNotFound
+from .steps import DEFAULT_BATCH, changed
+from . import components
+
+def _stitch(forward: dict, backward: dict, meet: tuple) -> dict:
+    '''
+    Given the forward parents (towards start), the backward parents
+    (towards goal) and the cell where they meet returns one came_from
+    dictionary leading from goal back to start
+    '''
+    came_from = {cell: parent for cell, parent in forward.items() if parent is not None}
+    current = meet
+    while backward[current] is not None:
+        came_from[backward[current]] = current
+        current = backward[current]
+    return came_from
+
+
+class BidirectionalBFS(BFS):
+    '''
+    Breadth first search grown one layer at a time from both start and
+    goal, finds the same optimal path length as BFS.bfs
+    '''
+
+    def __init__(self, board: Board, start: tuple, goal: tuple, graph=None) -> None:
+        super().__init__(board, start, goal, graph)
+        self.expanded_forward = 0
+        self.expanded_backward = 0
+
+    def adjacent(self, row: int, col: int) -> tuple:
+        '''
+        returns a tuple generator of the passable neighbors of the
+        given row/col, visited or not
+        '''
+        if self._graph is not None:
+            return self._graph.neighbors(row, col)
+        rows = [-1,0,0,1]
+        cols = [0,-1,1,0]
+        return ((row + rows[i], col + cols[i]) for i in range(len(rows))
+                if self._board.is_valid_pos((row + rows[i], col + cols[i]))
+                and self._board[row + rows[i], col + cols[i]] != BoardOptions().wall)
+
+    def _expand_layer(self, frontier: list, parents: dict, depth: dict, other_depth: dict) -> tuple:
+        '''
+        expands one whole layer of a side, returns the next layer and the
+        best (length, cell) meeting the other side, None if they didn't meet
+        '''
+        next_layer = []
+        best = None
+        for cell in frontier:
+            for neighbor in self.adjacent(*cell):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = cell
+                depth[neighbor] = depth[cell] + 1
+                next_layer.append(neighbor)
+                if neighbor in other_depth:
+                    length = depth[neighbor] + other_depth[neighbor]
+                    if best is None or length < best[0]:
+                        best = (length, neighbor)
+        return next_layer, best
+
+    def steps(self, batch: int = DEFAULT_BATCH):
+        '''
+        Bidirectional breadth first search as a generator yielding an
+        (N, 2) array of each layer expanded and finally the cells of the
+        route, bfs runs it to the end. batch 0 yields only the route
+        '''
+        if self._graph is None and not components.connected(self._board, self.start, self.goal):
+            raise PathNotFound
+        forward, backward = {self.start: None}, {self.goal: None}
+        forward_depth, backward_depth = {self.start: 0}, {self.goal: 0}
+        forward_layer, backward_layer = [self.start], [self.goal]
+        best = (0, self.start) if self.start == self.goal else None
+
+        while best is None and forward_layer and backward_layer:
+            # always grow the smaller frontier
+            if len(forward_layer) <= len(backward_layer):
+                self.expanded_forward += len(forward_layer)
+                layer = forward_layer
+                forward_layer, best = self._expand_layer(forward_layer, forward, forward_depth, backward_depth)
+            else:
+                self.expanded_backward += len(backward_layer)
+                layer = backward_layer
+                backward_layer, best = self._expand_layer(backward_layer, backward, backward_depth, forward_depth)
+            self.expanded = self.expanded_forward + self.expanded_backward
+            if batch:
+                yield changed(layer)
+
+        if best is None:
+            raise PathNotFound
+        total_path = self.reconstruct_path(_stitch(forward, backward, best[1]), self.goal)
+        yield changed(self.path)
+        return total_path
+
+
+class BidirectionalAstar(Astar):
+    '''
+    Astar run from both start and goal, stops once neither open set can
+    hold a path cheaper than the best meeting found, finds the same
+    optimal cost as Astar.astar
+    '''
+
+    def __init__(self, board: Board, start: tuple, goal: tuple, graph=None) -> None:
+        super().__init__(board, start, goal, graph)
+        self.expanded_forward = 0
+        self.expanded_backward = 0
+        self.cost = None
+
+    def steps(self, batch: int = DEFAULT_BATCH):
+        '''
+        Bidirectional Astar as a generator yielding an (N, 2) array of the
+        cells expanded by both sides every batch expansions and finally the
+        cells of the route, astar runs it to the end. batch 0 yields only
+        the route
+        '''
+        if self._graph is None and not components.connected(self._board, self.start, self.goal):
+            raise PathNotFound
+        # the backward g score is the cost from a cell to the goal, not
+        # counting the cell itself, so a meeting costs g_forward + g_backward
+        forward, backward = {self.start: None}, {self.goal: None}
+        forward_g, backward_g = {self.start: 0}, {self.goal: 0}
+        forward_closed, backward_closed = set(), set()
+        forward_open = [(self.h(*self.start, *self.goal), self.start)]
+        backward_open = [(self.h(*self.goal, *self.start), self.goal)]
+        best = (0, self.start) if self.start == self.goal else (float('inf'), None)
+        expanded = []
+
+        while forward_open and backward_open:
+            if batch and len(expanded) >= batch:
+                yield changed(expanded)
+                expanded = []
+            if best[0] <= forward_open[0][0] or best[0] <= backward_open[0][0]:
+                break
+            if len(forward_open) <= len(backward_open):
+                current = heapq.heappop(forward_open)[1]
+                if current in forward_closed:
+                    continue
+                forward_closed.add(current)
+                self.expanded_forward += 1
+                if batch:
+                    expanded.append(current)
+                for neighbor, cost in self.edges(*current):
+                    tentative_g = forward_g[current] + cost
+                    if tentative_g < forward_g.get(neighbor, float('inf')):
+                        forward[neighbor] = current
+                        forward_g[neighbor] = tentative_g
+                        heapq.heappush(forward_open, (tentative_g + self.h(*neighbor, *self.goal), neighbor))
+                        if neighbor in backward_g and tentative_g + backward_g[neighbor] < best[0]:
+                            best = (tentative_g + backward_g[neighbor], neighbor)
+            else:
+                current = heapq.heappop(backward_open)[1]
+                if current in backward_closed:
+                    continue
+                backward_closed.add(current)
+                self.expanded_backward += 1
+                if batch:
+                    expanded.append(current)
+                cost = 1 + int(self._board[current])
+                for neighbor in self.neighbors(*current):
+                    tentative_g = backward_g[current] + cost
+                    if tentative_g < backward_g.get(neighbor, float('inf')):
+                        backward[neighbor] = current
+                        backward_g[neighbor] = tentative_g
+                        heapq.heappush(backward_open, (tentative_g + self.h(*neighbor, *self.start), neighbor))
+                        if neighbor in forward_g and forward_g[neighbor] + tentative_g < best[0]:
+                            best = (forward_g[neighbor] + tentative_g, neighbor)
+
+        self.expanded = self.expanded_forward + self.expanded_backward
+        if expanded:
+            yield changed(expanded)
+        if best[1] is None:
+            raise PathNotFound
+        self.cost = int(best[0])
+        total_path = self.reconstruct_path(_stitch(forward, backward, best[1]), self.goal)
+        yield changed(self.path)
+        return total_path
+
+
+if __name__ == '__main__':
+    # expansions against the single direction searches on an open board
+    import random
+    from .wavefront_bfs import WavefrontBFS
+
+    random.seed(0)
+    board = Board(150, 150)
+    for _ in range(2000):
+        board[random.randrange(150), random.randrange(150)] = BoardOptions().wall
+    start, goal = (0, 0), (149, 149)
+    board[start] = board[goal] = BoardOptions().path
+
+    distance = WavefrontBFS(board, start, goal).distance_field()
+    single = int(((distance >= 0) & (distance < distance[goal])).sum())
+    bfs = BidirectionalBFS(board, start, goal)
+    length = len(bfs.bfs())
+    print(f'BFS length {length} expanded {single}, bidirectional expanded '
+          f'{bfs.expanded_forward} + {bfs.expanded_backward}')
+
+    board.replace(BoardOptions().route, BoardOptions().path)
+    board.replace(BoardOptions().start_end, BoardOptions().path)
+    astar = Astar(board, start, goal)
+    astar.astar()
+    board.replace(BoardOptions().route, BoardOptions().path)
+    bidirectional = BidirectionalAstar(board, start, goal)
+    bidirectional.astar()
+    print(f'Astar expanded {astar.expanded}, bidirectional cost {bidirectional.cost} '
+          f'expanded {bidirectional.expanded_forward} + {bidirectional.expanded_backward}')
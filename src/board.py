@@ -1,8 +1,13 @@
 # .pathfinding/src/board.py
 
 import numpy
+from contextlib import contextmanager
 from dataclasses import dataclass
-from itertools import cycle
+from itertools import cycle, count
+
+# Board.version is bumped on every mutation, the counter is shared by all
+# boards so a version is never reused, even after __call__
+_versions = count()
 
 class Board:
 
@@ -17,26 +22,203 @@ class Board:
         self.cols = cols
         self._border = border
         self._border_size = 1
+        self._passability = None
+        self._watchers = []
+        self.version = next(_versions)
         self.board_setup()
-    
+
+    @classmethod
+    def wrap(cls, array, border: bool = False):
+        '''
+        Returns a board backed by the given 2d int8 array without copying
+        it, when border is true the array includes the border ring
+        '''
+        assert array.ndim == 2 and array.dtype == numpy.int8, f"Board.wrap: expected a 2d int8 array, got {array.dtype} {array.shape}"
+        board = cls.__new__(cls)
+        rows, cols = array.shape
+        if border:
+            rows, cols = rows - 2, cols - 2
+        board._validate(rows, cols, border)
+        board.rows = rows
+        board.cols = cols
+        board._border = border
+        board._border_size = 1
+        board._passability = None
+        board._watchers = []
+        board.version = next(_versions)
+        board._board = array
+        return board
+
+    @classmethod
+    def create_memmap(cls, filename: str, rows: int, cols: int, border: bool = False):
+        '''
+        Returns an empty board backed by a new .npy file instead of memory,
+        changes reach the file on flush()
+        '''
+        cls._validate(cls, rows, cols, border)
+        shape = (rows + 2, cols + 2) if border else (rows, cols)
+        array = numpy.lib.format.open_memmap(filename, mode='w+', dtype=numpy.int8, shape=shape)
+        board = cls.wrap(array, border)
+        board._clear()
+        return board
+
+    @classmethod
+    def open_memmap(cls, filename: str, border: bool = False, mode: str = 'r+'):
+        '''
+        Returns a board backed by an existing .npy file, pages are loaded
+        as they are read. With mode 'r' the board is read-only and
+        can be opened by any number of processes without copying it
+        '''
+        assert mode in ('r', 'r+'), f"Board.open_memmap: unsupported mode '{mode}'"
+        return cls.wrap(numpy.load(filename, mmap_mode=mode), border)
+
+    @property
+    def filename(self):
+        '''
+        the file backing a memory mapped board, None for boards in memory
+        '''
+        return getattr(self._board, 'filename', None)
+
+    def flush(self) -> None:
+        '''
+        Writes the changes of a memory mapped board to its file
+        '''
+        if isinstance(self._board, numpy.memmap):
+            self._board.flush()
+
     def board_setup(self) -> None:
         if self._border:
             self._board = numpy.ones([self.rows + 2 * self._border_size, self.cols + 2 * self._border_size], numpy.int8)
             self._board[self._border_size:-self._border_size, self._border_size: -self._border_size] = 0
         else:
             self._board = numpy.zeros([self.rows, self.cols], dtype=numpy.int8)
+        self._sync_passability()
+
+    def _clear(self) -> None:
+        '''
+        board_setup in place, keeps the array so memory maps stay mapped
+        '''
+        if self._border:
+            self._board.fill(BoardOptions().wall)
+            self._board[self._border_size:-self._border_size, self._border_size: -self._border_size] = 0
+        else:
+            self._board.fill(0)
+        self._sync_passability()
     
     def fill(self, val) -> None:
         if self._border:
             self._board[self._border_size:-self._border_size, self._border_size: -self._border_size] = val
         else:
             self._board.fill(val)
+        self.version = next(_versions)
+        self._sync_passability()
+        self._notify(None)
 
     def reset(self) -> None:
-        self.board_setup()
+        self.version = next(_versions)
+        if isinstance(self._board, numpy.memmap):
+            self._clear()
+        else:
+            self.board_setup()
+        self._notify(None)
     
     def replace(self, current: int, goal: int) -> None:
-        self._board[self._board == current] = goal
+        matches = self._board == current
+        if current == goal or not matches.any():
+            # nothing changes, the version and so cached paths stay valid
+            return
+        self._board[matches] = goal
+        self.version = next(_versions)
+        self._sync_passability()
+        self._notify(None)
+
+    def set_rows(self, row: int, values) -> None:
+        '''
+        Writes a 2d array of values over the usable rows starting at row
+        in one go, values must be as wide as the board. Only the written
+        rows of the passability are synced, inside batched() watchers hear
+        about it once at the end
+        '''
+        values = numpy.asarray(values)
+        assert values.ndim == 2 and values.shape[1] == self.cols, f"Board.set_rows: expected {self.cols} columns, got shape {values.shape}"
+        assert 0 <= row and row + len(values) <= self.rows, f"Board.set_rows: rows {row}..{row + len(values)} out of range"
+        if self._border:
+            self._board[row + self._border_size:row + self._border_size + len(values), self._border_size:-self._border_size] = values
+        else:
+            self._board[row:row + len(values)] = values
+        self.version = next(_versions)
+        if self._passability is not None:
+            self._passability._update_rows(row, values != BoardOptions().wall)
+        self._notify(None)
+
+    @contextmanager
+    def batched(self):
+        '''
+        Holds back the watchers while the board is changed in several
+        steps, such as loading it chunk by chunk, they are notified once
+        for the whole board at the end if anything changed
+        '''
+        watchers, self._watchers = self._watchers, []
+        version = self.version
+        try:
+            yield self
+        finally:
+            self._watchers = watchers + self._watchers
+            if self.version != version:
+                self._notify(None)
+
+    def paint(self, cells, val: int, only: int = None) -> None:
+        '''
+        Writes val to every (row, col) of the (N, 2) array cells in one go,
+        when only is given just the cells holding only are painted, e.g.
+        board.paint(result.path, BoardOptions().route, only=BoardOptions().path)
+        '''
+        cells = numpy.asarray(cells, numpy.intp).reshape(-1, 2)
+        assert ((cells >= 0) & (cells < self.size())).all(), "Board.paint: cells out of range"
+        offset = self._border_size if self._border else 0
+        rows, cols = cells[:, 0] + offset, cells[:, 1] + offset
+        keep = self._board[rows, cols] != val
+        if only is not None:
+            keep &= self._board[rows, cols] == only
+        rows, cols, cells = rows[keep], cols[keep], cells[keep]
+        if not len(cells):
+            return
+        self._board[rows, cols] = val
+        self.version = next(_versions)
+        if self._passability is not None:
+            self._passability._set_many(cells, val != BoardOptions().wall)
+        if self._watchers:
+            self._notify([(int(row), int(col)) for row, col in cells])
+
+    def watch(self, callback) -> None:
+        '''
+        Calls callback(board, cells) after every change made through the
+        board, cells is a list of the (row, col) changed or None when the
+        whole board may have changed
+        '''
+        self._watchers.append(callback)
+
+    def unwatch(self, callback) -> None:
+        self._watchers.remove(callback)
+
+    def _notify(self, cells) -> None:
+        # a copy, watchers may unwatch themselves while being called
+        for callback in list(self._watchers):
+            callback(self, cells)
+
+    def passability(self):
+        '''
+        Returns the read-only Passability view of the board, it is
+        kept in sync with every change made through the board
+        '''
+        if self._passability is None:
+            self._passability = Passability(self.rows, self.cols)
+            self._sync_passability()
+        return self._passability
+
+    def _sync_passability(self) -> None:
+        if self._passability is not None:
+            self._passability._update(self.view() != BoardOptions().wall)
     
     def size(self):
         '''
@@ -49,7 +231,18 @@ class Board:
         Returns the size of the entire board space
         '''
         return self._board.shape
-    
+
+    def view(self):
+        '''
+        Returns a read-only numpy view of the usable board
+        '''
+        if self._border:
+            view = self._board[self._border_size:-self._border_size, self._border_size: -self._border_size]
+        else:
+            view = self._board.view()
+        view.flags.writeable = False
+        return view
+
     def row(self, row: int):
         assert self.is_valid_row(row), f"Board.row: invalid row '{row}'"
         return self._board[row,:]
@@ -110,7 +303,15 @@ class Board:
         if type(val) not in (int, float):
             print(type(val), val)
             raise TypeError(f'Board.__setitem___: illegal value {val}')
+        if self._board[self._normalize(index)] == val:
+            # rewriting a cell, e.g. dragging a wall over walls, is not a change
+            return
         self._board[self._normalize(index)] = val
+        self.version = next(_versions)
+        if self._passability is not None:
+            self._passability._set(index, val != BoardOptions().wall)
+        if self._watchers:
+            self._notify([index])
 
     def __delitem__(self, index):
         if type(index) is not tuple or len(index) != 2 or\
@@ -118,7 +319,14 @@ class Board:
            or not self.is_valid_row(index[0]) or \
            not self.is_valid_col(index[1]):
             raise TypeError(f'Board.__getitem___: illegal index {index}')
+        if self._board[self._normalize(index)] == 0:
+            return
         self._board[self._normalize(index)] = 0
+        self.version = next(_versions)
+        if self._passability is not None:
+            self._passability._set(index, BoardOptions().path != BoardOptions().wall)
+        if self._watchers:
+            self._notify([index])
 
     def __str__(self) -> str:
         return str(self._board)
@@ -129,6 +337,54 @@ class Board:
     def __call__(self, *args: any, **kwds: any) -> None:
         self.__init__(*args, **kwds)
 
+class Passability:
+    '''
+    Read-only passability of a board laid out like a bordered board,
+    a contiguous uint8 grid of 1 for passable cells and 0 for walls with
+    a ring of wall sentinels around the usable cells so neighbors can be
+    expanded without bounds checks
+    '''
+
+    def __init__(self, rows: int, cols: int) -> None:
+        self.shape = (rows + 2, cols + 2)
+        self.stride = cols + 2
+        # same order as the rows/cols neighbor lists of the search classes
+        self.offsets = (-self.stride, -1, 1, self.stride)
+        self._cells = numpy.zeros(self.shape[0] * self.shape[1], numpy.uint8)
+        self.cells = self._cells.view()
+        self.cells.flags.writeable = False
+
+    def grid(self):
+        '''
+        Returns a read-only 2d view of the padded cells
+        '''
+        return self.cells.reshape(self.shape)
+
+    def index(self, row: int, col: int) -> int:
+        '''
+        Returns the flat index of the usable position (row, col)
+        '''
+        return (row + 1) * self.stride + col + 1
+
+    def position(self, index: int) -> tuple:
+        '''
+        Returns the usable position (row, col) of a flat index
+        '''
+        row, col = divmod(index, self.stride)
+        return (row - 1, col - 1)
+
+    def _update(self, passable) -> None:
+        self._cells.reshape(self.shape)[1:-1, 1:-1] = passable
+
+    def _update_rows(self, row: int, passable) -> None:
+        self._cells.reshape(self.shape)[row + 1:row + 1 + len(passable), 1:-1] = passable
+
+    def _set(self, pos: tuple, passable: bool) -> None:
+        self._cells[self.index(*pos)] = passable
+
+    def _set_many(self, cells, passable: bool) -> None:
+        self._cells.reshape(self.shape)[cells[:, 0] + 1, cells[:, 1] + 1] = passable
+
 @dataclass
 class BoardOptions:
     path: int = 0
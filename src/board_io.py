@@ -0,0 +1,227 @@
+# .pathfinding/src/board_io.py
+import struct
+import numpy
+from .board import Board, BoardOptions
+
+MAGIC = b'PFBD'
+FORMAT_VERSION = 1
+# magic, format version, encoding, border, rows, cols
+HEADER = struct.Struct('<4sBBBxII')
+
+# 1 bit per cell, set for walls, for boards holding only paths and walls
+BITS = 0
+# 4 bits per cell, two cells a byte with the first in the high nibble
+NIBBLES = 1
+
+DEFAULT_CHUNK_ROWS = 1024
+
+def row_bytes(encoding: int, cols: int) -> int:
+    '''
+    returns the size in bytes of one encoded row
+    '''
+    return (cols + 7) // 8 if encoding == BITS else (cols + 1) // 2
+
+def paths_and_walls(values) -> bool:
+    '''
+    returns true if values only holds paths and walls
+    '''
+    return bool(((values == BoardOptions().path) | (values == BoardOptions().wall)).all())
+
+def choose_encoding(values) -> int:
+    '''
+    returns BITS if values only holds paths and walls, else NIBBLES
+    '''
+    return BITS if paths_and_walls(values) else NIBBLES
+
+def encode_rows(values, encoding: int) -> bytes:
+    '''
+    encodes a 2d array of board values row by row
+    '''
+    values = numpy.asarray(values)
+    if encoding == BITS:
+        return numpy.packbits(values == BoardOptions().wall, axis=1).tobytes()
+    if values.size and (values.min() < 0 or values.max() > 15):
+        raise ValueError('encode_rows: values must be within 0..15 for nibble encoding')
+    cells = values.astype(numpy.uint8)
+    if cells.shape[1] % 2:
+        cells = numpy.pad(cells, ((0, 0), (0, 1)))
+    return (cells[:, 0::2] << 4 | cells[:, 1::2]).tobytes()
+
+def decode_rows(data: bytes, encoding: int, cols: int):
+    '''
+    decodes whole encoded rows back into a 2d int8 array
+    '''
+    packed = numpy.frombuffer(data, numpy.uint8).reshape(-1, row_bytes(encoding, cols))
+    if encoding == BITS:
+        bits = numpy.unpackbits(packed, axis=1, count=cols)
+        return (bits * BoardOptions().wall + (1 - bits) * BoardOptions().path).astype(numpy.int8)
+    cells = numpy.empty((len(packed), packed.shape[1] * 2), numpy.int8)
+    cells[:, 0::2] = packed >> 4
+    cells[:, 1::2] = packed & 0x0F
+    return cells[:, :cols]
+
+
+class BoardWriter:
+    '''
+    Writes a board to a binary file a chunk of rows at a time, file is a
+    path or a binary file object. Pass encoding=NIBBLES unless every
+    row written holds only paths and walls
+    '''
+
+    def __init__(self, file, rows: int, cols: int, border: bool = False, encoding: int = BITS) -> None:
+        assert encoding in (BITS, NIBBLES), f"BoardWriter: unsupported encoding '{encoding}'"
+        self._owns = isinstance(file, (str, bytes)) or hasattr(file, '__fspath__')
+        self._file = open(file, 'wb') if self._owns else file
+        self.rows = rows
+        self.cols = cols
+        self.encoding = encoding
+        self.written = 0
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, encoding, border, rows, cols))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, kind, *args) -> None:
+        self.close(complete=kind is None)
+
+    def write_rows(self, values) -> None:
+        '''
+        appends a 2d array of whole rows
+        '''
+        values = numpy.asarray(values)
+        assert values.ndim == 2 and values.shape[1] == self.cols, f"BoardWriter.write_rows: expected {self.cols} columns, got shape {values.shape}"
+        assert self.written + len(values) <= self.rows, 'BoardWriter.write_rows: more rows than the header'
+        if self.encoding == BITS and not paths_and_walls(values):
+            raise ValueError('BoardWriter.write_rows: weighted cells need encoding=NIBBLES')
+        self._file.write(encode_rows(values, self.encoding))
+        self.written += len(values)
+
+    def close(self, complete: bool = True) -> None:
+        if complete:
+            assert self.written == self.rows, f"BoardWriter.close: wrote {self.written} of {self.rows} rows"
+        if self._owns:
+            self._file.close()
+
+
+class BoardReader:
+    '''
+    Reads a board written by BoardWriter a chunk of rows at a time,
+    file is a path or a binary file object
+    '''
+
+    def __init__(self, file) -> None:
+        self._owns = isinstance(file, (str, bytes)) or hasattr(file, '__fspath__')
+        self._file = open(file, 'rb') if self._owns else file
+        header = self._file.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError('BoardReader: truncated header')
+        magic, version, self.encoding, border, self.rows, self.cols = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError('BoardReader: not a board file')
+        if version != FORMAT_VERSION:
+            raise ValueError(f"BoardReader: unsupported format version '{version}'")
+        if self.encoding not in (BITS, NIBBLES):
+            raise ValueError(f"BoardReader: unsupported encoding '{self.encoding}'")
+        self.border = bool(border)
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def read_rows(self, count: int):
+        '''
+        returns the next count rows, fewer at the end of the board,
+        as a 2d int8 array
+        '''
+        count = min(count, self.rows - self.read)
+        size = count * row_bytes(self.encoding, self.cols)
+        data = self._file.read(size)
+        if len(data) != size:
+            raise ValueError('BoardReader.read_rows: truncated file')
+        self.read += count
+        return decode_rows(data, self.encoding, self.cols)
+
+    def chunks(self, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        '''
+        yields (row, values) for the remaining rows, chunk_rows at a time
+        '''
+        while self.read < self.rows:
+            row = self.read
+            yield row, self.read_rows(chunk_rows)
+
+    def read_into(self, board: Board, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Board:
+        '''
+        copies the remaining rows into a board of the same size,
+        such as one from Board.create_memmap
+        '''
+        assert board.size() == (self.rows, self.cols), f"BoardReader.read_into: board is {board.size()}, file is {(self.rows, self.cols)}"
+        with board.batched():
+            for row, values in self.chunks(chunk_rows):
+                board.set_rows(row, values)
+        return board
+
+    def close(self) -> None:
+        if self._owns:
+            self._file.close()
+
+
+def save_board(board: Board, file, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+    '''
+    Writes board to file with the smallest encoding that holds it
+    '''
+    values = board.view()
+    rows, cols = board.size()
+    with BoardWriter(file, rows, cols, board._border, choose_encoding(values)) as writer:
+        for row in range(0, rows, chunk_rows):
+            writer.write_rows(values[row:row + chunk_rows])
+
+def load_board(file, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Board:
+    '''
+    Returns a new board read from file
+    '''
+    with BoardReader(file) as reader:
+        board = Board(reader.rows, reader.cols, reader.border)
+        return reader.read_into(board, chunk_rows)
+
+
+if __name__ == '__main__':
+    # size and speed against pickle and npz
+    import io
+    import pickle
+    import time
+    from .rand_prim import RandomPrim
+
+    def measure(name, save, load):
+        t = time.perf_counter()
+        data = save()
+        save_time = time.perf_counter() - t
+        t = time.perf_counter()
+        load(data)
+        load_time = time.perf_counter() - t
+        print(f'  {name}: {len(data) / 1024:.1f} KiB, save {save_time * 1000:.2f}ms, load {load_time * 1000:.2f}ms')
+
+    def board_bytes(board):
+        buffer = io.BytesIO()
+        save_board(board, buffer)
+        return buffer.getvalue()
+
+    def npz_bytes(board, compressed):
+        buffer = io.BytesIO()
+        (numpy.savez_compressed if compressed else numpy.savez)(buffer, board=board._board)
+        return buffer.getvalue()
+
+    maze = Board(1001, 1001)
+    RandomPrim(maze).prims()
+    weighted = Board(1000, 1000)
+    weighted.set_rows(0, numpy.random.default_rng(0).choice(
+        [BoardOptions().path, BoardOptions().wall, BoardOptions().w_path, BoardOptions().s_path], size=(1000, 1000)))
+
+    for name, board in (('maze', maze), ('weighted', weighted)):
+        print(f'{name} {board.size()}:')
+        measure('board_io', lambda: board_bytes(board), lambda data: load_board(io.BytesIO(data)))
+        measure('pickle', lambda: pickle.dumps(board._board), pickle.loads)
+        measure('npz', lambda: npz_bytes(board, False), lambda data: numpy.load(io.BytesIO(data))['board'])
+        measure('npz compressed', lambda: npz_bytes(board, True), lambda data: numpy.load(io.BytesIO(data))['board'])
@@ -2,27 +2,42 @@
 from collections import deque
 import numpy
 from .board import Board, BoardOptions
+from .graph import CompiledGraph
 from .errors import PathNotFound
+from .steps import DEFAULT_BATCH, changed, run
+from .result import SearchResult
+from . import stats as instrument
+from . import components
 
 class BFS: 
 
-    def __init__(self, board: Board, start: tuple, goal: tuple) -> None:
+    def __init__(self, board: Board, start: tuple, goal: tuple, graph: CompiledGraph = None) -> None:
         self._board = board
         self.start = start
         self.goal = goal
+        self._graph = graph
         self._visited = numpy.zeros(self._board.size())
+        self.expanded = 0
+        self._paint = True
 
     def reconstruct_path(self, cameFrom: dict, current: set) -> dict:
         '''
         Given a dictionary of paths and a current value returns a set
-        of the reconstruced path from its origin
+        of the reconstruced path from its origin, the ordered path is
+        kept in self.path, the route is marked on the board unless
+        run by solve
         '''
         total_path = {current}
+        self.path = [current]
         while current != self.start:
             current = cameFrom[current]
             total_path.add(current)
-            self._board[current] = BoardOptions().route
-        self._board[self.start] = BoardOptions().start_end
+            self.path.append(current)
+            if self._paint:
+                self._board[current] = BoardOptions().route
+        if self._paint:
+            self._board[self.start] = BoardOptions().start_end
+        self.path.reverse()
         return total_path
 
     def is_valid(self,row: int, col: int) -> bool:
@@ -41,6 +56,8 @@ class BFS:
         '''
         #rows = [-1,0,0,1,1,-1,1,-1]
         #cols = [0,-1,1,0,1,-1,-1,1]
+        if self._graph is not None:
+            return (neighbor for neighbor in self._graph.neighbors(row, col) if not self._visited[neighbor])
         rows = [-1,0,0,1]
         cols = [0,-1,1,0]
         return ((row + rows[i], col + cols[i]) for i in range(len(rows)) if self.is_valid(row + rows[i], col + cols[i]))
@@ -50,25 +67,81 @@ class BFS:
         Breadth first search pathfinding algorithm on the grid given,
         finds the optimal path
         '''
+        return run(self.steps(0))
+
+    def solve(self) -> SearchResult:
+        '''
+        Runs bfs without touching the board and returns the
+        SearchResult of its path, raises PathNotFound if there is none
+        '''
+        self._paint = False
+        try:
+            run(self.steps(0))
+        finally:
+            self._paint = True
+        return SearchResult.from_path(self._board, self.path, type(self).__name__, self.expanded)
+
+    def steps(self, batch: int = DEFAULT_BATCH):
+        '''
+        Breadth first search as a generator yielding an (N, 2) array of the cells
+        expanded every batch expansions and finally the cells of the route,
+        returns what bfs returns. batch 0 yields only the route
+        '''
+        if self._graph is None and not components.connected(self._board, self.start, self.goal):
+            raise PathNotFound
+        stats = instrument.begin(self)
+        self.expanded = 0
         s = deque()
         s.append(self.start)
 
         came_from = {}
+        expanded = []
 
         while s:
             v = s.popleft()
+            if stats is not None:
+                stats.pops += 1
             if v == self.goal:
-                return self.reconstruct_path(came_from, v)
+                if expanded:
+                    yield changed(expanded)
+                if stats is not None:
+                    instrument.lap(stats, 'search')
+                total_path = self.reconstruct_path(came_from, v)
+                if stats is not None:
+                    self._finish(stats, 'reconstruct_path')
+                yield changed(self.path)
+                return total_path
             
+            self.expanded += 1
+            if batch:
+                expanded.append(v)
+                if len(expanded) >= batch:
+                    yield changed(expanded)
+                    expanded = []
             for neighbor in self.neighbors(*v):
                 came_from[neighbor] = v
                 self._visited[neighbor] = 1
                 s.append(neighbor)
+                if stats is not None:
+                    stats.neighbors += 1
+                    stats.pushes += 1
 
                         
 
+        if stats is not None:
+            self._finish(stats, 'search')
         raise PathNotFound
 
+    def _finish(self, stats, phase: str) -> None:
+        '''
+        closes the last phase of an instrumented run and reports it
+        '''
+        instrument.lap(stats, phase)
+        stats.expanded = self.expanded
+        # the start is queued before the loop
+        stats.pushes += 1
+        instrument.end(stats)
+
 
 if __name__ == '__main__':
     m = Board(10,10)
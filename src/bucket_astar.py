@@ -0,0 +1,130 @@
+# .pathfinding/src/bucket_astar.py
+import numpy
+from .board import Board, BoardOptions
+from .fast_astar import FastAstar
+from .errors import PathNotFound
+from . import components
+
+# largest step cost the bucket queue is picked for by planner.choose_engine
+MAX_BUCKET_COST = 64
+
+def max_step_cost(board: Board) -> int:
+    '''
+    returns the largest cost Astar.astar pays to enter a passable cell
+    '''
+    values = board.view()
+    passable = values[values != BoardOptions().wall]
+    return 1 + int(passable.max()) if passable.size else 1
+
+
+class BucketAstar(FastAstar):
+    '''
+    FastAstar with a circular bucket queue (Dial's algorithm) in place of
+    the binary heap, finds the same optimal cost as Astar.astar. A step
+    costs 1 to C and moves the Manhattan heuristic by 1, so a neighbor's
+    f is within C + 1 of the f being expanded and C + 2 buckets indexed by
+    f modulo C + 2 hold every queued cell, pushes and pops are O(1)
+    '''
+
+    def search(self) -> list:
+        '''
+        Runs astar without touching the board and returns the
+        ordered path from start to goal, the path cost is kept in self.cost
+        '''
+        assert self._board.is_valid_pos(self.start), f"BucketAstar.search: invalid start '{self.start}'"
+        assert self._board.is_valid_pos(self.goal), f"BucketAstar.search: invalid goal '{self.goal}'"
+        if not components.connected(self._board, self.start, self.goal):
+            raise PathNotFound
+        self._setup()
+        costs = self._costs.tolist()
+        g_score = [numpy.iinfo(numpy.int64).max] * len(costs)
+        parent = self._parent
+        offsets = self._offsets
+        width = self._width
+        start = self.index(*self.start)
+        goal = self.index(*self.goal)
+        goal_row, goal_col = divmod(goal, width)
+        closed = bytearray(len(costs))
+
+        span = max(costs) + 2
+        buckets = [[] for _ in range(span)]
+        f = abs(start // width - goal_row) + abs(start % width - goal_col)
+        g_score[start] = 0
+        buckets[f % span].append(start)
+        queued = 1
+        expanded = 0
+
+        while queued:
+            bucket = buckets[f % span]
+            while not bucket:
+                f += 1
+                bucket = buckets[f % span]
+            # last in first out favors the deeper cells among equal f
+            current = bucket.pop()
+            queued -= 1
+            if closed[current]:
+                continue
+            closed[current] = 1
+            expanded += 1
+            if current == goal:
+                self.expanded = expanded
+                self.cost = g_score[goal]
+                return self.reconstruct_path(goal)
+            current_g = g_score[current]
+            for offset in offsets:
+                neighbor = current + offset
+                cost = costs[neighbor]
+                if cost < 0 or closed[neighbor]:
+                    continue
+                tentative_g = current_g + cost
+                if tentative_g < g_score[neighbor]:
+                    g_score[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    row, col = divmod(neighbor, width)
+                    buckets[(tentative_g + abs(row - goal_row) + abs(col - goal_col)) % span].append(neighbor)
+                    queued += 1
+
+        self.expanded = expanded
+        raise PathNotFound
+
+
+if __name__ == '__main__':
+    # throughput against the heap based FastAstar on weighted boards
+    import random
+    import time
+    from .astar_main import Astar
+
+    for size in (100, 200, 400):
+        random.seed(size)
+        board = Board(size, size)
+        for _ in range(size * size // 3):
+            board[random.randrange(size), random.randrange(size)] = random.choice(
+                [BoardOptions().wall, BoardOptions().w_path, BoardOptions().s_path])
+        start, goal = (0, 0), (size - 1, size - 1)
+        for row, col in ((0, 0), (0, 1), (1, 0), (size - 1, size - 1), (size - 1, size - 2), (size - 2, size - 1)):
+            board[row, col] = BoardOptions().path
+
+        heap = FastAstar(board, start, goal)
+        t = time.perf_counter()
+        heap.search()
+        heap_time = time.perf_counter() - t
+        bucket = BucketAstar(board, start, goal)
+        t = time.perf_counter()
+        bucket.search()
+        bucket_time = time.perf_counter() - t
+
+        print(f'{size}x{size}: FastAstar {heap.expanded / heap_time:.0f} nodes/s (cost {heap.cost})  '
+              f'BucketAstar {bucket.expanded / bucket_time:.0f} nodes/s (cost {bucket.cost})  '
+              f'speedup {heap_time / bucket_time:.2f}x')
+
+    board = Board(60, 60)
+    random.seed(1)
+    for _ in range(1200):
+        board[random.randrange(60), random.randrange(60)] = random.choice(
+            [BoardOptions().wall, BoardOptions().w_path, BoardOptions().s_path])
+    board[0, 0] = board[59, 59] = BoardOptions().path
+    bucket = BucketAstar(board, (0, 0), (59, 59))
+    bucket.search()
+    values = board.view().copy()
+    path = Astar(board, (0, 0), (59, 59)).astar()
+    print(f'60x60: Astar cost {sum(1 + int(values[cell]) for cell in path if cell != (0, 0))}, BucketAstar cost {bucket.cost}')
@@ -0,0 +1,301 @@
+# .pathfinding/src/components.py
+import weakref
+from collections import deque
+import numpy
+from .board import Board, BoardOptions
+
+NO_COMPONENT = -1
+
+def label_components(passable) -> numpy.ndarray:
+    '''
+    Given a 2d boolean mask of passable cells returns a flat int32 array
+    holding for every cell the index of the root of its 4-connected
+    component, NO_COMPONENT for walls. Vectorized union-find, every round
+    hooks the larger root of each edge whose ends differ onto the smaller
+    one and then jumps pointers until every cell points at its root.
+    An edge is stored as its first cell only, the second one is a fixed
+    step to the right or down
+    '''
+    rows, cols = passable.shape
+    assert rows * cols < numpy.iinfo(numpy.int32).max, f"label_components: board of {rows}x{cols} is too large"
+    cells = passable.ravel()
+    right = passable[:, :-1] & passable[:, 1:]
+    down = passable[:-1, :] & passable[1:, :]
+    # a right edge's index in right is off by one per row from its cell's
+    first_right = numpy.flatnonzero(right).astype(numpy.int32)
+    if cols > 1:
+        first_right += first_right // (cols - 1)
+    edges = [(first_right, 1), (numpy.flatnonzero(down).astype(numpy.int32), cols)]
+    del right, down, first_right
+
+    parent = numpy.arange(rows * cols, dtype=numpy.int32)
+    while any(a.size for a, _ in edges):
+        hooked = False
+        for number, (a, step) in enumerate(edges):
+            root_a, root_b = parent[a], parent[a + step]
+            differ = root_a != root_b
+            # edges already inside one component stay that way
+            a, root_a, root_b = a[differ], root_a[differ], root_b[differ]
+            edges[number] = (a, step)
+            if a.size:
+                numpy.minimum.at(parent, numpy.maximum(root_a, root_b), numpy.minimum(root_a, root_b))
+                hooked = True
+        if not hooked:
+            break
+        while True:
+            grandparent = parent[parent]
+            if (grandparent == parent).all():
+                break
+            parent = grandparent
+    parent[~cells] = NO_COMPONENT
+    return parent
+
+
+class ComponentIndex:
+    '''
+    Connected components of a board's passable cells, answers whether a
+    path can exist in O(1). Every cell holds a label and labels of merged
+    components point at each other like a union-find. Cells turned passable
+    through the board merge the labels around them, a wall added floods out
+    from its former neighbors in lockstep until all but one flood meet, and
+    only the pieces cut off get a new label, so an edit costs the size of
+    the smaller side of a split. Whole board changes label it again on the
+    next query
+    '''
+
+    def __init__(self, board: Board) -> None:
+        # weak, the index is kept in a WeakKeyDictionary keyed on the board
+        self._board = weakref.ref(board)
+        self.rows, self.cols = board.size()
+        self.rebuilds = 0
+        self._version = None
+        board.watch(self._on_change)
+
+    def close(self) -> None:
+        board = self._board()
+        if board is not None:
+            try:
+                board.unwatch(self._on_change)
+            except ValueError:
+                # the board was reinitialized by __call__ and forgot its watchers
+                pass
+
+    def _rebuild(self, board: Board) -> None:
+        self._passable = board.view() != BoardOptions().wall
+        self._labels = label_components(self._passable)
+        # labels merged since, label -> the label it was merged into
+        self._merged = {}
+        # labels handed out to pieces cut off, past every cell index
+        self._next_label = self.rows * self.cols
+        self._version = board.version
+        self.rebuilds += 1
+
+    def _on_change(self, board: Board, cells) -> None:
+        if self._version is None:
+            return
+        if cells is None:
+            self._version = None
+            return
+        for cell in cells:
+            passable = board[cell] != BoardOptions().wall
+            if passable == self._passable[cell]:
+                continue
+            if passable:
+                self._add(cell)
+            else:
+                self._remove(cell)
+        self._version = board.version
+
+    def _find(self, label: int) -> int:
+        merged = self._merged
+        root = label
+        while root in merged:
+            root = merged[root]
+        while label != root:
+            # path compression
+            merged[label], label = root, merged[label]
+        return root
+
+    def _neighbors(self, node: int) -> list:
+        row, col = divmod(node, self.cols)
+        neighbors = []
+        if row > 0:
+            neighbors.append(node - self.cols)
+        if col > 0:
+            neighbors.append(node - 1)
+        if col < self.cols - 1:
+            neighbors.append(node + 1)
+        if row < self.rows - 1:
+            neighbors.append(node + self.cols)
+        return neighbors
+
+    def _new_label(self) -> int:
+        label = self._next_label
+        self._next_label += 1
+        return label
+
+    def _add(self, cell: tuple) -> None:
+        '''
+        merges a cell that became passable with its passable neighbors
+        '''
+        node = cell[0] * self.cols + cell[1]
+        passable = self._passable.ravel()
+        passable[node] = True
+        root = self._labels[node] = self._new_label()
+        for neighbor in self._neighbors(node):
+            if passable[neighbor]:
+                other = self._find(int(self._labels[neighbor]))
+                if other != root:
+                    self._merged[other] = root
+
+    def _remove(self, cell: tuple) -> None:
+        '''
+        Takes a cell that became a wall out of its component. Breadth first
+        floods start from each passable neighbor and take turns expanding
+        one cell, a flood reaching another's cells hands its frontier over
+        and a flood running out of cells first is a piece cut off, its
+        cells get a new label
+        '''
+        node = cell[0] * self.cols + cell[1]
+        passable = self._passable.ravel()
+        passable[node] = False
+        self._labels[node] = NO_COMPONENT
+        sources = [neighbor for neighbor in self._neighbors(node) if passable[neighbor]]
+        if len(sources) < 2:
+            return
+        owner = {source: flood for flood, source in enumerate(sources)}
+        # flood -> the flood it was handed to, active floods map to themselves
+        joined = list(range(len(sources)))
+        visited = [[source] for source in sources]
+        frontiers = [deque([source]) for source in sources]
+        active = list(range(len(sources)))
+        while len(active) > 1:
+            for flood in list(active):
+                if len(active) == 1:
+                    break
+                frontier = frontiers[flood]
+                if not frontier:
+                    # everything reachable from here was visited
+                    self._labels[visited[flood]] = self._new_label()
+                    active.remove(flood)
+                    continue
+                current = frontier.popleft()
+                for neighbor in self._neighbors(current):
+                    if not passable[neighbor]:
+                        continue
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = flood
+                        visited[flood].append(neighbor)
+                        frontier.append(neighbor)
+                        continue
+                    while joined[other] != other:
+                        other = joined[other]
+                    if other != flood:
+                        # one piece, the other flood carries on from both frontiers
+                        frontier.appendleft(current)
+                        frontiers[other].extend(frontier)
+                        visited[other].extend(visited[flood])
+                        joined[flood] = other
+                        active.remove(flood)
+                        break
+
+    def component(self, cell: tuple) -> int:
+        '''
+        Returns the id of the component holding cell, NO_COMPONENT for walls
+        '''
+        board = self._board()
+        if self._version != board.version:
+            self._rebuild(board)
+        if not self._passable[cell]:
+            return NO_COMPONENT
+        return self._find(int(self._labels[cell[0] * self.cols + cell[1]]))
+
+    def connected(self, start: tuple, goal: tuple) -> bool:
+        '''
+        Returns false when no search can reach goal from start. Like the
+        searches a start on a wall may still step onto its passable
+        neighbors while a goal on a wall is never reached
+        '''
+        if start == goal:
+            return True
+        target = self.component(goal)
+        if target == NO_COMPONENT:
+            return False
+        if self._passable[start]:
+            return self.component(start) == target
+        row, col = start
+        return any(self.component(neighbor) == target
+                   for neighbor in ((row - 1, col), (row, col - 1), (row, col + 1), (row + 1, col))
+                   if 0 <= neighbor[0] < self.rows and 0 <= neighbor[1] < self.cols)
+
+
+_indexes = weakref.WeakKeyDictionary()
+
+def component_index(board: Board) -> ComponentIndex:
+    '''
+    Returns the ComponentIndex of the board, created on first use and
+    kept up to date through Board.watch. Memory mapped boards only get
+    one by calling this, the searches don't label them on their own
+    '''
+    index = _indexes.get(board)
+    if index is None or index.rows != board.rows or index.cols != board.cols:
+        if index is not None:
+            index.close()
+        index = ComponentIndex(board)
+        _indexes[board] = index
+    return index
+
+def connected(board: Board, start: tuple, goal: tuple) -> bool:
+    '''
+    Returns false when start and goal are in different components of
+    the board, so a search between them can raise PathNotFound at once.
+    Without an index a memory mapped board answers true, labeling it
+    would read every page of the file
+    '''
+    index = _indexes.get(board)
+    if index is None:
+        if board.filename is not None:
+            return True
+        index = component_index(board)
+    return index.connected(start, goal)
+
+
+if __name__ == '__main__':
+    # unreachable queries on a walled off maze, with and without the index
+    import time
+    from .errors import PathNotFound
+    from .fast_prim import FastPrim
+    from .breadth_first_search import BFS
+    from .astar_main import Astar
+    from . import components
+
+    board = Board(201, 201)
+    FastPrim(board, numpy.random.default_rng(0)).prims()
+    goal = tuple(int(i) for i in numpy.argwhere(board.view() == BoardOptions().path)[-1])
+    row, col = goal
+    for cell in ((row - 1, col), (row, col - 1), (row, col + 1), (row + 1, col)):
+        if board.is_valid_pos(cell):
+            board[cell] = BoardOptions().wall
+    start = tuple(int(i) for i in numpy.argwhere(board.view() == BoardOptions().path)[0])
+
+    t = time.perf_counter()
+    label_components(board.view() != BoardOptions().wall)
+    print(f'201x201 labeling: {(time.perf_counter() - t) * 1000:.2f}ms')
+    for search in (BFS, Astar):
+        t = time.perf_counter()
+        try:
+            search(board, start, goal).solve()
+        except PathNotFound:
+            pass
+        indexed = time.perf_counter() - t
+        components.connected, check = (lambda *args: True), components.connected
+        t = time.perf_counter()
+        try:
+            search(board, start, goal).solve()
+        except PathNotFound:
+            pass
+        exhausted = time.perf_counter() - t
+        components.connected = check
+        print(f'{search.__name__}: unreachable goal {indexed * 1000:.3f}ms with the index, '
+              f'{exhausted * 1000:.1f}ms exhausting the maze')
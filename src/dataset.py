@@ -0,0 +1,150 @@
+# .pathfinding/src/dataset.py
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy
+from .board import Board, BoardOptions
+from .fast_prim import FastPrim
+from .fast_depth_first import FastDepthFirst
+from .eller import Eller
+from .wavefront_bfs import wavefront
+
+DEFAULT_SHARD_SIZE = 256
+GENERATORS = ('prim', 'depth', 'eller')
+
+@dataclass
+class DatasetReport:
+    mazes: int = 0
+    seconds: float = 0.0
+    workers: int = 0
+    files: tuple = ()
+
+    @property
+    def mazes_per_second(self) -> float:
+        return self.mazes / self.seconds if self.seconds else 0.0
+
+    @property
+    def mazes_per_second_per_core(self) -> float:
+        return self.mazes_per_second / self.workers if self.workers else 0.0
+
+
+def maze_rng(seed: int, index: int) -> numpy.random.Generator:
+    '''
+    returns the generator of maze index, the same child SeedSequence.spawn
+    would hand out, so a maze doesn't depend on the shard or worker it ran on
+    '''
+    return numpy.random.default_rng(numpy.random.SeedSequence(seed, spawn_key=(index,)))
+
+def generate_maze(board: Board, generator: str, rng: numpy.random.Generator) -> None:
+    '''
+    carves a maze on board with one of GENERATORS
+    '''
+    if generator == 'prim':
+        FastPrim(board, rng).prims()
+    elif generator == 'depth':
+        FastDepthFirst(board, rng).depth()
+    elif generator == 'eller':
+        rows, cols = board.size()
+        Eller(cols, rows, seed=int(rng.integers(2 ** 63))).write(board)
+    else:
+        raise ValueError(f"generate_maze: unsupported generator '{generator}'")
+
+def _generate_shard(path: str, first: int, count: int, rows: int, cols: int,
+                    generator: str, seed: int, pairs: int) -> int:
+    '''
+    worker task, generates mazes first..first + count and writes them to
+    one shard, returns the number of mazes written
+    '''
+    board = Board(rows, cols)
+    walls = numpy.empty((count, rows, (cols + 7) // 8), numpy.uint8)
+    starts = numpy.empty((count, pairs, 2), numpy.int32)
+    goals = numpy.empty((count, pairs, 2), numpy.int32)
+    lengths = numpy.empty((count, pairs), numpy.int32)
+
+    for i in range(count):
+        rng = maze_rng(seed, first + i)
+        generate_maze(board, generator, rng)
+        values = board.view()
+        walls[i] = numpy.packbits(values == BoardOptions().wall, axis=1)
+        if not pairs:
+            continue
+        passable = values != BoardOptions().wall
+        cells = numpy.argwhere(passable)
+        chosen = cells[rng.integers(len(cells), size=(pairs, 2))]
+        starts[i], goals[i] = chosen[:, 0], chosen[:, 1]
+        by_start = {}
+        for j, start in enumerate(starts[i].tolist()):
+            by_start.setdefault(tuple(start), []).append(j)
+        for start, js in by_start.items():
+            # one field per distinct start, cut short at the goal when it has only one
+            field = wavefront(passable, start, tuple(goals[i, js[0]].tolist()) if len(js) == 1 else None)
+            # the mazes are connected, a length of -1 would mean they aren't
+            lengths[i, js] = field[goals[i, js, 0], goals[i, js, 1]]
+
+    numpy.savez(path, walls=walls, shape=numpy.array([rows, cols]),
+                indices=numpy.arange(first, first + count), starts=starts, goals=goals, lengths=lengths)
+    return count
+
+def load_shard(path: str) -> dict:
+    '''
+    Returns a shard as a dict of numpy arrays, mazes is an (n, rows, cols)
+    int8 array of board values, starts/goals are (n, pairs, 2) and lengths
+    the (n, pairs) BFS path lengths in steps
+    '''
+    with numpy.load(path) as shard:
+        data = dict(shard)
+    rows, cols = data.pop('shape').tolist()
+    bits = numpy.unpackbits(data.pop('walls'), axis=2, count=cols)
+    data['mazes'] = (bits * BoardOptions().wall + (1 - bits) * BoardOptions().path).astype(numpy.int8)
+    return data
+
+def generate_dataset(directory: str, count: int, rows: int, cols: int, generator: str = 'prim',
+                     seed: int = 0, pairs: int = 0, workers: int = None,
+                     shard_size: int = DEFAULT_SHARD_SIZE) -> DatasetReport:
+    '''
+    Generates count mazes of rows x cols on a process pool and writes them
+    to shard_00000.npz, shard_00001.npz... in directory, each holding up to
+    shard_size mazes with pairs random start/goal pairs and their BFS path
+    lengths. Shards are the unit of work, so they are cut smaller when needed
+    to give every worker one. Maze i only depends on seed and i
+    '''
+    assert generator in GENERATORS, f"generate_dataset: unsupported generator '{generator}'"
+    assert count > 0 and shard_size > 0, 'generate_dataset: count and shard_size must be positive'
+    os.makedirs(directory, exist_ok=True)
+    shard_size = min(shard_size, math.ceil(count / (workers or os.cpu_count())))
+    firsts = range(0, count, shard_size)
+    # workers without a shard would only idle and skew the per core rate
+    workers = min(workers or os.cpu_count(), len(firsts))
+    paths = [os.path.join(directory, f'shard_{i:05d}.npz') for i in range(len(firsts))]
+    sizes = [min(shard_size, count - first) for first in firsts]
+
+    t = time.perf_counter()
+    with ProcessPoolExecutor(workers) as executor:
+        written = sum(executor.map(_generate_shard, paths, firsts, sizes, [rows] * len(firsts),
+                                   [cols] * len(firsts), [generator] * len(firsts),
+                                   [seed] * len(firsts), [pairs] * len(firsts)))
+    return DatasetReport(written, time.perf_counter() - t, workers, tuple(paths))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='generate a sharded maze dataset')
+    parser.add_argument('directory')
+    parser.add_argument('--count', type=int, default=1024)
+    parser.add_argument('--rows', type=int, default=101)
+    parser.add_argument('--cols', type=int, default=101)
+    parser.add_argument('--generator', choices=GENERATORS, default='prim')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pairs', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE)
+    args = parser.parse_args()
+
+    report = generate_dataset(args.directory, args.count, args.rows, args.cols, args.generator,
+                              args.seed, args.pairs, args.workers, args.shard_size)
+    print(f'{report.mazes} mazes in {len(report.files)} shards, {report.seconds:.2f}s, '
+          f'{report.mazes_per_second:.1f} mazes/s, {report.mazes_per_second_per_core:.1f} mazes/s per core '
+          f'({report.workers} workers)')
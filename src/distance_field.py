@@ -0,0 +1,210 @@
+# .pathfinding/src/distance_field.py
+import heapq
+from collections import OrderedDict
+import numpy
+from .board import Board, BoardOptions
+from .wavefront_bfs import wavefront
+from .errors import PathNotFound
+
+UNREACHED = -1
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+class DistanceField:
+    '''
+    One-to-all search from source, holds the Astar.astar cost from source
+    to every cell and each cell's parent towards source as flat int32
+    arrays so any goal's path is a walk along the parents
+    '''
+
+    def __init__(self, board: Board, source: tuple) -> None:
+        assert board.is_valid_pos(source), f"DistanceField: invalid source '{source}'"
+        self.source = source
+        self.version = board.version
+        self.rows, self.cols = board.size()
+        values = board.view()
+        passable = values != BoardOptions().wall
+        entered = passable.copy()
+        entered[source] = False
+        costs = values[entered]
+        if costs.size and (costs == costs[0]).all():
+            self._wavefront(passable, 1 + int(costs[0]))
+        else:
+            self._dijkstra(board)
+
+    @property
+    def nbytes(self) -> int:
+        return self.distance.nbytes + self.parent.nbytes
+
+    def _wavefront(self, passable, step_cost: int) -> None:
+        '''
+        fills the fields with a numpy breadth first search, used when
+        every passable cell costs the same
+        '''
+        distance = wavefront(passable, self.source)
+        parent = numpy.full(distance.shape, UNREACHED, numpy.int32)
+        nodes = numpy.arange(distance.size, dtype=numpy.int32).reshape(distance.shape)
+        reached = distance > 0
+        # reversed so the first direction in neighbor order wins
+        for row, col in ((1, 0), (0, 1), (0, -1), (-1, 0)):
+            here = (slice(max(0, -row), self.rows - max(0, row)), slice(max(0, -col), self.cols - max(0, col)))
+            there = (slice(max(0, row), self.rows + min(0, row)), slice(max(0, col), self.cols + min(0, col)))
+            match = reached[here] & (distance[there] == distance[here] - 1)
+            parent[here][match] = nodes[there][match]
+        distance[reached] *= step_cost
+        self.distance = distance.ravel()
+        self.parent = parent.ravel()
+
+    def _dijkstra(self, board: Board) -> None:
+        '''
+        fills the fields with Dijkstra's algorithm on the board's
+        passability layout
+        '''
+        passability = board.passability()
+        stride = passability.stride
+        costs = numpy.full(passability.shape, -1, numpy.int64)
+        costs[1:-1, 1:-1] = board.view()
+        costs[1:-1, 1:-1] += 1
+        costs[passability.grid() == 0] = -1
+        costs = costs.ravel().tolist()
+        offsets = passability.offsets
+        size = len(costs)
+
+        distance = numpy.full(size, UNREACHED, numpy.int64)
+        parent = numpy.full(size, UNREACHED, numpy.int64)
+        start = passability.index(*self.source)
+        best = {start: 0}
+        closed = bytearray(size)
+        open_set = [start]
+
+        while open_set:
+            key = heapq.heappop(open_set)
+            current = key % size
+            if closed[current]:
+                continue
+            closed[current] = 1
+            current_g = key // size
+            distance[current] = current_g
+            for offset in offsets:
+                neighbor = current + offset
+                cost = costs[neighbor]
+                if cost < 0 or closed[neighbor]:
+                    continue
+                tentative_g = current_g + cost
+                if tentative_g < best.get(neighbor, tentative_g + 1):
+                    best[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    heapq.heappush(open_set, tentative_g * size + neighbor)
+
+        # back from the padded layout to usable row * cols + col indices
+        inner = (slice(1, -1), slice(1, -1))
+        parent = parent.reshape(passability.shape)[inner]
+        has_parent = parent != UNREACHED
+        parent[has_parent] = (parent[has_parent] // stride - 1) * self.cols + parent[has_parent] % stride - 1
+        self.distance = distance.reshape(passability.shape)[inner].astype(numpy.int32).ravel()
+        self.parent = parent.astype(numpy.int32).ravel()
+
+    def cost(self, goal: tuple) -> int:
+        '''
+        returns the cost of the optimal path from source to goal,
+        raises PathNotFound if goal can't be reached
+        '''
+        cost = int(self.distance[goal[0] * self.cols + goal[1]])
+        if cost == UNREACHED:
+            raise PathNotFound
+        return cost
+
+    def path(self, goal: tuple) -> list:
+        '''
+        returns the ordered optimal path from source to goal,
+        raises PathNotFound if goal can't be reached
+        '''
+        self.cost(goal)
+        parent = self.parent
+        current = goal[0] * self.cols + goal[1]
+        total_path = [goal]
+        while parent[current] != UNREACHED:
+            current = int(parent[current])
+            total_path.append(divmod(current, self.cols))
+        total_path.reverse()
+        return total_path
+
+
+class DistanceFieldCache:
+    '''
+    LRU cache of DistanceFields for one board keyed on source and the
+    board's version, bounded by the bytes the fields hold
+    '''
+
+    def __init__(self, board: Board, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self._board = board
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._fields = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def field(self, source: tuple) -> DistanceField:
+        '''
+        returns the DistanceField from source, building it if it
+        isn't cached for the board's current version
+        '''
+        key = (source, self._board.version)
+        if key in self._fields:
+            self._fields.move_to_end(key)
+            return self._fields[key]
+
+        # fields of an older board version can never be hit again
+        for stale in [k for k in self._fields if k[1] != self._board.version]:
+            self.nbytes -= self._fields.pop(stale).nbytes
+        field = DistanceField(self._board, source)
+        self._fields[key] = field
+        self.nbytes += field.nbytes
+        while self.nbytes > self.max_bytes and len(self._fields) > 1:
+            self.nbytes -= self._fields.popitem(last=False)[1].nbytes
+        return field
+
+    def path(self, source: tuple, goal: tuple) -> list:
+        '''
+        returns the ordered optimal path from source to goal
+        '''
+        return self.field(source).path(goal)
+
+    def cost(self, source: tuple, goal: tuple) -> int:
+        '''
+        returns the cost of the optimal path from source to goal
+        '''
+        return self.field(source).cost(goal)
+
+
+if __name__ == '__main__':
+    # many goals from one source against a fresh FastAstar per goal
+    import random
+    import time
+    from .fast_astar import FastAstar
+
+    random.seed(0)
+    board = Board(300, 300)
+    for _ in range(9000):
+        board[random.randrange(300), random.randrange(300)] = random.choice([BoardOptions().wall, BoardOptions().w_path])
+    source = (0, 0)
+    board[source] = BoardOptions().path
+    goals = [(random.randrange(300), random.randrange(300)) for _ in range(100)]
+    goals = [goal for goal in goals if board[goal] != BoardOptions().wall]
+
+    t = time.perf_counter()
+    cache = DistanceFieldCache(board)
+    for goal in goals:
+        try:
+            cache.path(source, goal)
+        except PathNotFound:
+            pass
+    print(f'DistanceFieldCache: {time.perf_counter() - t:.3f}s for {len(goals)} goals')
+
+    t = time.perf_counter()
+    for goal in goals:
+        try:
+            FastAstar(board, source, goal).search()
+        except PathNotFound:
+            pass
+    print(f'FastAstar: {time.perf_counter() - t:.3f}s for {len(goals)} goals')
@@ -0,0 +1,230 @@
+# .pathfinding/src/dstar_lite.py
+import heapq
+from .board import Board, BoardOptions
+from .errors import PathNotFound
+from . import components
+
+INF = float('inf')
+
+class DStarLite:
+    '''
+    D* Lite incremental planner, searches backwards from goal and keeps its
+    search state between calls so that after cells of the board change only
+    the affected part of the path is repaired. Costs match Astar.astar,
+    moving onto a cell costs 1 + board[cell]
+    '''
+
+    def __init__(self, board: Board, start: tuple, goal: tuple) -> None:
+        self._board = board
+        self.start = start
+        self.goal = goal
+        self.cost = None
+        self.touched = 0
+        self._planned = False
+
+    def h(self, a: int, b: int) -> int:
+        '''
+        heuristic function (Manhattan distance) between two flat indices
+        '''
+        a_row, a_col = divmod(a, self._width)
+        b_row, b_col = divmod(b, self._width)
+        return abs(a_row - b_row) + abs(a_col - b_col)
+
+    def _cell_cost(self, row: int, col: int) -> int:
+        value = int(self._board[row, col])
+        return -1 if value == BoardOptions().wall else 1 + value
+
+    def _setup(self) -> None:
+        '''
+        copies the board's costs into the padded layout, walls and the
+        sentinel ring cost -1
+        '''
+        passability = self._board.passability()
+        self._passability = passability
+        self._width = passability.stride
+        self._offsets = passability.offsets
+        rows, cols = self._board.size()
+        values = self._board.view().tolist()
+        self._costs = [-1] * (passability.shape[0] * passability.shape[1])
+        for row in range(rows):
+            base = passability.index(row, 0)
+            for col, value in enumerate(values[row]):
+                self._costs[base + col] = -1 if value == BoardOptions().wall else 1 + value
+        self._g = {}
+        self._rhs = {}
+        self._open = {}
+        self._queue = []
+        self._km = 0
+        self._start = passability.index(*self.start)
+        self._goal = passability.index(*self.goal)
+        self._rhs[self._goal] = 0
+        self._push(self._goal)
+
+    def _edge(self, u: int, v: int) -> float:
+        '''
+        the cost of moving from u onto its neighbor v
+        '''
+        return INF if self._costs[v] < 0 else self._costs[v]
+
+    def _key(self, u: int) -> tuple:
+        best = min(self._g.get(u, INF), self._rhs.get(u, INF))
+        return (best + self.h(self._start, u) + self._km, best)
+
+    def _push(self, u: int) -> None:
+        key = self._key(u)
+        self._open[u] = key
+        heapq.heappush(self._queue, (key, u))
+
+    def _top(self) -> tuple:
+        '''
+        returns the (key, cell) of the smallest live queue entry,
+        dropping entries that were removed or re-keyed
+        '''
+        while self._queue:
+            key, u = self._queue[0]
+            if self._open.get(u) == key:
+                return key, u
+            heapq.heappop(self._queue)
+        return (INF, INF), None
+
+    def _update_vertex(self, u: int) -> None:
+        # like Astar a search may leave a start that is a wall, no other
+        # wall or sentinel can be left
+        if self._costs[u] < 0 and u != self._start:
+            self._rhs[u] = INF
+        elif u != self._goal:
+            self._rhs[u] = min((self._edge(u, u + offset) + self._g.get(u + offset, INF)
+                                for offset in self._offsets), default=INF)
+        self._open.pop(u, None)
+        if self._g.get(u, INF) != self._rhs.get(u, INF):
+            self._push(u)
+
+    def _compute_shortest_path(self) -> None:
+        touched = 0
+        while True:
+            key, u = self._top()
+            start_key = self._key(self._start)
+            if not (key < start_key or self._rhs.get(self._start, INF) != self._g.get(self._start, INF)):
+                break
+            if u is None:
+                break
+            touched += 1
+            heapq.heappop(self._queue)
+            del self._open[u]
+            new_key = self._key(u)
+            if key < new_key:
+                self._push(u)
+            elif self._g.get(u, INF) > self._rhs.get(u, INF):
+                self._g[u] = self._rhs[u]
+                for offset in self._offsets:
+                    self._update_vertex(u + offset)
+            else:
+                self._g[u] = INF
+                self._update_vertex(u)
+                for offset in self._offsets:
+                    self._update_vertex(u + offset)
+        self.touched = touched
+
+    def reconstruct_path(self) -> list:
+        '''
+        returns the ordered path from start to goal following the
+        cheapest neighbor of every cell
+        '''
+        current = self._start
+        total_path = [current]
+        while current != self._goal:
+            u = current
+            current = min((u + offset for offset in self._offsets),
+                          key=lambda v: self._edge(u, v) + self._g.get(v, INF))
+            total_path.append(current)
+        return [self._passability.position(i) for i in total_path]
+
+    def _repair(self) -> list:
+        '''
+        brings the search up to date and returns the path, start and goal
+        in different components fail at once and the pending repairs wait
+        in the queue for the next call
+        '''
+        if not components.connected(self._board, self.start, self.goal):
+            self.cost = None
+            self.touched = 0
+            raise PathNotFound
+        self._compute_shortest_path()
+        return self._result()
+
+    def _result(self) -> list:
+        cost = self._g.get(self._start, INF)
+        if cost == INF:
+            self.cost = None
+            raise PathNotFound
+        self.cost = int(cost)
+        return self.reconstruct_path()
+
+    def plan(self) -> list:
+        '''
+        Runs the initial search and returns the ordered path from
+        start to goal
+        '''
+        assert self._board.is_valid_pos(self.start), f"DStarLite.plan: invalid start '{self.start}'"
+        assert self._board.is_valid_pos(self.goal), f"DStarLite.plan: invalid goal '{self.goal}'"
+        self._setup()
+        self._planned = True
+        return self._repair()
+
+    def update(self, cells: list) -> list:
+        '''
+        Given the (row, col) cells changed on the board since the last
+        call repairs the search and returns the new ordered path,
+        self.touched holds the number of cells the repair expanded
+        '''
+        assert self._planned, 'DStarLite.update: plan must be called first'
+        changed = []
+        for row, col in cells:
+            u = self._passability.index(row, col)
+            cost = self._cell_cost(row, col)
+            if cost != self._costs[u]:
+                self._costs[u] = cost
+                changed.append(u)
+        for u in changed:
+            self._update_vertex(u)
+            for offset in self._offsets:
+                self._update_vertex(u + offset)
+        return self._repair()
+
+    def move(self, start: tuple) -> list:
+        '''
+        Moves the start, for an agent walking the path, and returns the
+        ordered path from the new start
+        '''
+        assert self._planned, 'DStarLite.move: plan must be called first'
+        new_start = self._passability.index(*start)
+        self._km += self.h(self._start, new_start)
+        self._start = new_start
+        self.start = start
+        self._update_vertex(new_start)
+        return self._repair()
+
+
+if __name__ == '__main__':
+    # replanning after single wall edits against a fresh search
+    import random
+    from .fast_astar import FastAstar
+
+    random.seed(0)
+    board = Board(120, 120)
+    for _ in range(1500):
+        board[random.randrange(120), random.randrange(120)] = BoardOptions().wall
+    start, goal = (0, 0), (119, 119)
+    board[start] = board[goal] = BoardOptions().path
+    planner = DStarLite(board, start, goal)
+    path = planner.plan()
+    print(f'plan: cost {planner.cost} touched {planner.touched}')
+
+    for _ in range(5):
+        cell = random.choice(path[1:-1])
+        board[cell] = BoardOptions().wall
+        path = planner.update([cell])
+        fresh = FastAstar(board, start, goal)
+        fresh.search()
+        print(f'wall at {cell}: cost {planner.cost} touched {planner.touched}, '
+              f'fresh FastAstar cost {fresh.cost} expanded {fresh.expanded}')
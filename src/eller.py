@@ -0,0 +1,145 @@
+# .pathfinding/src/eller.py
+import itertools
+import numpy
+from .board import Board, BoardOptions
+from .board_io import BoardWriter, BITS
+
+DEFAULT_JOIN_PROBABILITY = 0.5
+DEFAULT_DOWN_PROBABILITY = 0.4
+DEFAULT_BAND_ROWS = 256
+
+class Eller:
+    '''
+    Eller's algorithm, generates a perfect maze one row at a time keeping
+    only the current row's sets so memory grows with cols alone. Maze cells
+    sit on even rows and cols, the rows in between hold the passages down.
+    With rows=None the maze never ends, otherwise the last row joins every
+    remaining set. The randomness of maze row i comes from
+    numpy.random.default_rng([seed, i]) so a seed reproduces the maze exactly
+    '''
+
+    def __init__(self, cols: int, rows: int = None, seed: int = 0,
+                 join_probability: float = DEFAULT_JOIN_PROBABILITY,
+                 down_probability: float = DEFAULT_DOWN_PROBABILITY) -> None:
+        assert cols >= 1, f"Eller: cols must be at least 1, got '{cols}'"
+        assert rows is None or rows >= 1, f"Eller: rows must be at least 1, got '{rows}'"
+        self.cols = cols
+        self.rows = rows
+        self.seed = seed
+        self.join_probability = join_probability
+        self.down_probability = down_probability
+        self.cells = (cols + 1) // 2
+
+    def __iter__(self):
+        '''
+        yields the board rows in order as int8 arrays of cols values
+        '''
+        cells = self.cells
+        sets = numpy.arange(cells, dtype=numpy.int64)
+        next_set = cells
+        last = None if self.rows is None else (self.rows - 1) // 2
+
+        for index in itertools.count():
+            rng = numpy.random.default_rng([self.seed, index])
+            joins = rng.random(cells - 1) < self.join_probability
+            if index == last:
+                joins[:] = True
+            sets, joined = self._join(sets, joins)
+
+            row = numpy.full(self.cols, BoardOptions().wall, numpy.int8)
+            row[0::2] = BoardOptions().path
+            row[1:2 * cells - 1:2][joined] = BoardOptions().path
+            yield row
+            if index == last:
+                if self.rows % 2 == 0:
+                    yield numpy.full(self.cols, BoardOptions().wall, numpy.int8)
+                return
+
+            # every set goes down at least once, through its first cell in a random order
+            down = rng.random(cells) < self.down_probability
+            order = rng.permutation(cells)
+            _, first = numpy.unique(sets[order], return_index=True)
+            down[order[first]] = True
+
+            row = numpy.full(self.cols, BoardOptions().wall, numpy.int8)
+            row[0::2][down] = BoardOptions().path
+            yield row
+
+            fresh = numpy.count_nonzero(~down)
+            sets = numpy.where(down, sets, 0)
+            sets[~down] = numpy.arange(next_set, next_set + fresh)
+            next_set += fresh
+
+    @staticmethod
+    def _join(sets, joins) -> tuple:
+        '''
+        merges neighboring cells of different sets where joins is set,
+        returns the merged sets and which of the cols - 1 walls were opened
+        '''
+        parent = {}
+
+        def find(s):
+            while parent.get(s, s) != s:
+                s = parent[s]
+            return s
+
+        labels = sets.tolist()
+        joined = [False] * len(joins)
+        for i in numpy.flatnonzero(joins).tolist():
+            a, b = find(labels[i]), find(labels[i + 1])
+            if a != b:
+                parent[b] = a
+                joined[i] = True
+        return numpy.array([find(s) for s in labels], numpy.int64), numpy.array(joined, bool)
+
+    def bands(self, band_rows: int = DEFAULT_BAND_ROWS):
+        '''
+        yields (row, values) with values a (band_rows, cols) int8 array of
+        the board rows starting at row, the last band may be shorter
+        '''
+        rows = iter(self)
+        for row in itertools.count(0, band_rows):
+            band = list(itertools.islice(rows, band_rows))
+            if not band:
+                return
+            yield row, numpy.stack(band)
+
+    def row(self, index: int):
+        '''
+        returns board row index, replaying the maze from its first row
+        '''
+        assert self.rows is None or 0 <= index < self.rows, f"Eller.row: invalid row '{index}'"
+        return next(itertools.islice(self, index, None))
+
+    def write(self, board: Board, band_rows: int = DEFAULT_BAND_ROWS) -> Board:
+        '''
+        writes the maze into a board of rows x cols band by band
+        '''
+        assert board.size() == (self.rows, self.cols), f"Eller.write: board is {board.size()}, maze is {(self.rows, self.cols)}"
+        for row, values in self.bands(band_rows):
+            board.set_rows(row, values)
+        return board
+
+    def save(self, file, border: bool = False, band_rows: int = DEFAULT_BAND_ROWS) -> None:
+        '''
+        streams the maze into the board_io format without building a board
+        '''
+        assert self.rows is not None, 'Eller.save: the maze needs a height'
+        with BoardWriter(file, self.rows, self.cols, border, BITS) as writer:
+            for _, values in self.bands(band_rows):
+                writer.write_rows(values)
+
+
+if __name__ == '__main__':
+    # throughput of a tall corridor streamed in bands
+    import time
+
+    eller = Eller(40, 21, seed=7)
+    print(eller.write(Board(21, 40)))
+
+    eller = Eller(2000, seed=0)
+    t = time.perf_counter()
+    for row, band in itertools.islice(eller.bands(), 40):
+        pass
+    rows = row + len(band)
+    print(f'{rows}x{eller.cols}: {rows / (time.perf_counter() - t):.0f} rows/s')
@@ -0,0 +1,176 @@
+# .pathfinding/src/fast_astar.py
+import heapq
+import weakref
+import numpy
+from .board import Board, BoardOptions
+from .errors import PathNotFound
+from . import components
+
+_cost_grids = weakref.WeakKeyDictionary()
+
+def cost_grid(board: Board) -> numpy.ndarray:
+    '''
+    Returns the read-only flat cost grid of the board on its passability
+    layout, 1 + board[cell] with -1 for walls and the sentinel ring. Reused
+    until the board's version changes so a memory mapped board is read once
+    per version rather than once per search
+    '''
+    cached = _cost_grids.get(board)
+    if cached is not None and cached[0] == board.version:
+        return cached[1]
+    passability = board.passability()
+    costs = numpy.full(passability.shape, -1, numpy.int32)
+    costs[1:-1, 1:-1] = board.view()
+    costs[1:-1, 1:-1] += 1
+    costs[passability.grid() == 0] = -1
+    costs = costs.ravel()
+    costs.flags.writeable = False
+    _cost_grids[board] = (board.version, costs)
+    return costs
+
+
+class FastAstar:
+    '''
+    Array backed Astar, finds the same optimal cost as Astar.astar
+    while working on flat cell indices of the board's Passability layout
+    '''
+
+    def __init__(self, board: Board, start: tuple, goal: tuple) -> None:
+        self._board = board
+        self.start = start
+        self.goal = goal
+        self.cost = None
+        self.expanded = 0
+
+    def index(self, row: int, col: int) -> int:
+        '''
+        returns the flat index of the given row, col in the padded grid
+        '''
+        return self._passability.index(row, col)
+
+    def position(self, index: int) -> tuple:
+        '''
+        returns the (row, col) of the given flat index in the padded grid
+        '''
+        return self._passability.position(index)
+
+    def _setup(self) -> None:
+        '''
+        builds the padded cost grid on the board's passability layout and
+        preallocates the score arrays, walls and the sentinel ring cost -1
+        '''
+        self._passability = self._board.passability()
+        self._width = self._passability.stride
+        self._offsets = self._passability.offsets
+        self._costs = cost_grid(self._board)
+        self._g_score = numpy.full(self._costs.size, numpy.iinfo(numpy.int64).max, numpy.int64)
+        self._parent = numpy.full(self._costs.size, -1, numpy.int32)
+
+    def reconstruct_path(self, current: int) -> list:
+        '''
+        Given the flat index of the goal returns the ordered list
+        of (row, col) from start to goal
+        '''
+        parent = self._parent
+        total_path = [current]
+        while parent[current] != -1:
+            current = int(parent[current])
+            total_path.append(current)
+        total_path.reverse()
+        return [self.position(i) for i in total_path]
+
+    def search(self) -> list:
+        '''
+        Runs astar without touching the board and returns the
+        ordered path from start to goal, the path cost is kept in self.cost
+        '''
+        assert self._board.is_valid_pos(self.start), f"FastAstar.search: invalid start '{self.start}'"
+        assert self._board.is_valid_pos(self.goal), f"FastAstar.search: invalid goal '{self.goal}'"
+        if not components.connected(self._board, self.start, self.goal):
+            raise PathNotFound
+        self._setup()
+        costs = self._costs.tolist()
+        g_score = self._g_score
+        parent = self._parent
+        offsets = self._offsets
+        width = self._width
+        size = len(costs)
+        start = self.index(*self.start)
+        goal = self.index(*self.goal)
+        goal_row, goal_col = divmod(goal, width)
+        closed = bytearray(size)
+
+        # heap entries are single ints ordered by (f, h, index)
+        h_span = goal_row + goal_col + width + len(costs) // width
+        g_score[start] = 0
+        open_set = [(abs(start // width - goal_row) + abs(start % width - goal_col)) * h_span * size + start]
+        expanded = 0
+
+        while open_set:
+            key = heapq.heappop(open_set)
+            current = key % size
+            if closed[current]:
+                continue
+            closed[current] = 1
+            expanded += 1
+            if current == goal:
+                self.expanded = expanded
+                self.cost = int(g_score[goal])
+                return self.reconstruct_path(goal)
+            current_g = int(g_score[current])
+            for offset in offsets:
+                neighbor = current + offset
+                cost = costs[neighbor]
+                if cost < 0 or closed[neighbor]:
+                    continue
+                tentative_g = current_g + cost
+                if tentative_g < g_score[neighbor]:
+                    g_score[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    row, col = divmod(neighbor, width)
+                    h = abs(row - goal_row) + abs(col - goal_col)
+                    heapq.heappush(open_set, ((tentative_g + h) * h_span + h) * size + neighbor)
+
+        self.expanded = expanded
+        raise PathNotFound
+
+    def astar(self) -> set:
+        '''
+        Astar pathfinding algorithm on the grid given, finds the optimal
+        path and marks it on the board the same way Astar.astar does
+        '''
+        path = self.search()
+        for cell in path[:-1]:
+            if self._board[cell] == BoardOptions().path:
+                self._board[cell] = BoardOptions().route
+        return set(path)
+
+
+if __name__ == '__main__':
+    # benchmark against Astar on open boards with a few random walls
+    import random
+    import time
+    from .astar_main import Astar
+
+    for size in (100, 200, 400):
+        random.seed(size)
+        board = Board(size, size)
+        for _ in range(size * size // 10):
+            board[random.randrange(size), random.randrange(size)] = BoardOptions().wall
+        start, goal = (0, 0), (size - 1, size - 1)
+        for row, col in ((0, 0), (0, 1), (1, 0), (size - 1, size - 1), (size - 1, size - 2), (size - 2, size - 1)):
+            board[row, col] = BoardOptions().path
+        values = board.view().copy()
+
+        fast = FastAstar(board, start, goal)
+        t = time.perf_counter()
+        fast.search()
+        fast_time = time.perf_counter() - t
+
+        t = time.perf_counter()
+        path = Astar(board, start, goal).astar()
+        slow_time = time.perf_counter() - t
+        slow_cost = sum(1 + int(values[cell]) for cell in path if cell != start)
+
+        print(f'{size}x{size}: Astar {slow_time:.3f}s (cost {slow_cost})  '
+              f'FastAstar {fast_time:.3f}s (cost {fast.cost})  speedup {slow_time / fast_time:.1f}x')
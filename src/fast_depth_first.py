@@ -0,0 +1,130 @@
+# .pathfinding/src/fast_depth_first.py
+from array import array
+import numpy
+from .board import Board, BoardOptions
+
+DEFAULT_PROGRESS_EVERY = 1 << 16
+# random draws taken from the generator at a time
+DRAW_BATCH = 1 << 14
+
+PATH = BoardOptions().path
+WALL = BoardOptions().wall
+# value of the ring around the scratch cells, neither a path nor a wall
+# so the ring is never carved but never blocks a cell either
+OUTSIDE = 2
+assert OUTSIDE not in (PATH, WALL)
+
+class FastDepthFirst:
+    '''
+    Randomized depth first carving producing the same kind of maze as
+    RandomDepthFirst.depth, a carved cell never touches another passage
+    except the one it was carved from. Works on a padded flat scratch
+    array with per-direction offset tables and an int32 stack.
+    rng is a numpy.random.Generator, the maze is a function of its seed.
+    progress(carved) is called every progress_every cells
+    '''
+
+    def __init__(self, board: Board, rng: numpy.random.Generator = None, progress = None,
+                 progress_every: int = DEFAULT_PROGRESS_EVERY) -> None:
+        self._board = board
+        self.rng = numpy.random.default_rng() if rng is None else rng
+        self.progress = progress
+        self.progress_every = progress_every
+        self.carved = 0
+
+    @staticmethod
+    def directions(stride: int) -> list:
+        '''
+        returns (step, checks) for the 4 directions, checks being the
+        offsets around the cell one step away that must not be paths,
+        its 8 neighbors except the three on the side it is entered from
+        '''
+        tables = []
+        for row, col in ((-1, 0), (0, -1), (0, 1), (1, 0)):
+            checks = tuple(r * stride + c for r in (-1, 0, 1) for c in (-1, 0, 1)
+                           if (r, c) != (0, 0) and (r != -row if row else c != -col))
+            tables.append((row * stride + col, checks))
+        return tables
+
+    def depth(self) -> None:
+        '''
+        Carves the maze and writes it to the board in one go
+        '''
+        rows, cols = self._board.size()
+        stride = cols + 2
+        padded = numpy.full((rows + 2, cols + 2), OUTSIDE, numpy.uint8)
+        padded[1:-1, 1:-1] = WALL
+        cells = bytearray(padded.tobytes())
+        directions = self.directions(stride)
+
+        rng = self.rng
+        draws = []
+        drawn = 0
+        progress = self.progress
+        progress_every = self.progress_every
+
+        start_row = int(rng.integers(1, rows - 1)) if rows > 2 else 0
+        start = (start_row + 1) * stride + 1
+        cells[start] = PATH
+        carved = 1
+        stack = array('i', [start])
+        candidates = [0] * 4
+
+        while stack:
+            cell = stack[-1]
+            count = 0
+            for step, checks in directions:
+                neighbor = cell + step
+                if cells[neighbor] != WALL:
+                    continue
+                for check in checks:
+                    if cells[neighbor + check] == PATH:
+                        break
+                else:
+                    candidates[count] = neighbor
+                    count += 1
+            if not count:
+                stack.pop()
+                continue
+
+            if count == 1:
+                neighbor = candidates[0]
+            else:
+                if drawn == len(draws):
+                    draws = rng.random(DRAW_BATCH).tolist()
+                    drawn = 0
+                neighbor = candidates[int(draws[drawn] * count)]
+                drawn += 1
+            cells[neighbor] = PATH
+            carved += 1
+            if progress is not None and carved % progress_every == 0:
+                progress(carved)
+            stack.append(neighbor)
+
+        self.carved = carved
+        maze = numpy.frombuffer(cells, numpy.uint8).reshape(rows + 2, cols + 2)[1:-1, 1:-1]
+        self._board.set_rows(0, maze.astype(numpy.int8))
+
+
+if __name__ == '__main__':
+    # against RandomDepthFirst.depth
+    import random
+    import time
+    from .randomized_depth_first import RandomDepthFirst
+
+    random.seed(0)
+    for size in (25, 50, 100, 200):
+        board = Board(size, size)
+        t = time.perf_counter()
+        RandomDepthFirst(board).depth()
+        depth_time = time.perf_counter() - t
+        t = time.perf_counter()
+        FastDepthFirst(board, numpy.random.default_rng(0)).depth()
+        fast_time = time.perf_counter() - t
+        print(f'{size}x{size}: RandomDepthFirst {depth_time:.3f}s, FastDepthFirst {fast_time:.4f}s, {depth_time / fast_time:.0f}x')
+
+    for size in (1000, 2000):
+        board = Board(size, size)
+        t = time.perf_counter()
+        FastDepthFirst(board, numpy.random.default_rng(0)).depth()
+        print(f'{size}x{size}: FastDepthFirst {time.perf_counter() - t:.2f}s')
@@ -0,0 +1,126 @@
+# .pathfinding/src/fast_prim.py
+import numpy
+from .board import Board, BoardOptions
+
+DEFAULT_PROGRESS_EVERY = 1 << 16
+# random draws taken from the generator at a time
+DRAW_BATCH = 1 << 14
+
+PATH = BoardOptions().path
+WALL = BoardOptions().wall
+# value of the ring around the scratch cells, neither a path nor a wall
+OUTSIDE = 2
+assert OUTSIDE not in (PATH, WALL)
+
+class FastPrim:
+    '''
+    Randomized Prim's algorithm carving the same kind of maze as
+    RandomPrim.prims on a padded flat scratch array. The frontier is an
+    array with swap-remove so a random pop is O(1), each wall is queued
+    at most once. rng is a numpy.random.Generator, the maze is a function
+    of its seed. progress(carved) is called every progress_every cells
+    '''
+
+    def __init__(self, board: Board, rng: numpy.random.Generator = None, progress = None,
+                 progress_every: int = DEFAULT_PROGRESS_EVERY) -> None:
+        self._board = board
+        self.rng = numpy.random.default_rng() if rng is None else rng
+        self.progress = progress
+        self.progress_every = progress_every
+        self.carved = 0
+
+    def prims(self) -> None:
+        '''
+        Carves the maze and writes it to the board in one go
+        '''
+        rows, cols = self._board.size()
+        stride = cols + 2
+        padded = numpy.full((rows + 2, cols + 2), OUTSIDE, numpy.uint8)
+        padded[1:-1, 1:-1] = WALL
+        cells = bytearray(padded.tobytes())
+        queued = bytearray(len(cells))
+        offsets = (-stride, -1, 1, stride)
+        frontier = [0] * (rows * cols)
+        size = 0
+
+        rng = self.rng
+        draws = []
+        drawn = 0
+        progress = self.progress
+        progress_every = self.progress_every
+        carved = 0
+
+        start_row = int(rng.integers(1, rows - 1)) if rows > 2 else 0
+        start = (start_row + 1) * stride + 1
+        cells[start] = PATH
+        carved += 1
+        for offset in offsets:
+            wall = start + offset
+            if cells[wall] == WALL:
+                queued[wall] = 1
+                frontier[size] = wall
+                size += 1
+
+        while size:
+            if drawn == len(draws):
+                draws = rng.random(DRAW_BATCH).tolist()
+                drawn = 0
+            i = int(draws[drawn] * size)
+            drawn += 1
+            wall = frontier[i]
+            size -= 1
+            frontier[i] = frontier[size]
+
+            if cells[wall] != WALL:
+                continue
+            # the wall must touch exactly one path, the cell across from it
+            # has to be an uncarved wall
+            through = 0
+            for offset in offsets:
+                if cells[wall + offset] == PATH:
+                    if through:
+                        through = 0
+                        break
+                    through = offset
+            if not through or cells[wall - through] != WALL:
+                continue
+
+            cell = wall - through
+            cells[wall] = PATH
+            cells[cell] = PATH
+            carved += 2
+            if progress is not None and carved % progress_every < 2:
+                progress(carved)
+            for offset in offsets:
+                neighbor = cell + offset
+                if cells[neighbor] == WALL and not queued[neighbor]:
+                    queued[neighbor] = 1
+                    frontier[size] = neighbor
+                    size += 1
+
+        self.carved = carved
+        maze = numpy.frombuffer(cells, numpy.uint8).reshape(rows + 2, cols + 2)[1:-1, 1:-1]
+        self._board.set_rows(0, maze.astype(numpy.int8))
+
+
+if __name__ == '__main__':
+    # against RandomPrim.prims
+    import random
+    import time
+    from .rand_prim import RandomPrim
+
+    random.seed(0)
+    for size in (50, 100, 200):
+        board = Board(size, size)
+        t = time.perf_counter()
+        RandomPrim(board).prims()
+        prim_time = time.perf_counter() - t
+        t = time.perf_counter()
+        FastPrim(board, numpy.random.default_rng(0)).prims()
+        print(f'{size}x{size}: RandomPrim {prim_time:.3f}s, FastPrim {time.perf_counter() - t:.3f}s')
+
+    board = Board(4000, 4000)
+    t = time.perf_counter()
+    FastPrim(board, numpy.random.default_rng(0), progress=lambda carved: print(f'  {carved} cells carved'),
+             progress_every=1 << 20).prims()
+    print(f'4000x4000: FastPrim {time.perf_counter() - t:.1f}s')
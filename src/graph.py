@@ -0,0 +1,101 @@
+# .pathfinding/src/graph.py
+import weakref
+import numpy
+from .board import Board, BoardOptions
+
+# (row, col) steps in the same order as the search classes' neighbors
+_DIRECTIONS = ((-1, 0), (0, -1), (0, 1), (1, 0))
+
+class CompiledGraph:
+    '''
+    Compressed sparse row adjacency of a board, node n is the usable cell
+    (n // cols, n % cols) and its edges are indices[indptr[n]:indptr[n+1]]
+    with the cost Astar.astar adds for moving onto them, 1 + board[neighbor]
+    '''
+
+    def __init__(self, board: Board) -> None:
+        self.version = board.version
+        self.rows, self.cols = board.size()
+        values = board.view().astype(numpy.int32)
+        passable = values != BoardOptions().wall
+        nodes = numpy.arange(self.rows * self.cols, dtype=numpy.int32).reshape(self.rows, self.cols)
+
+        sources, targets = [], []
+        for row, col in _DIRECTIONS:
+            src = (slice(max(0, -row), self.rows - max(0, row)), slice(max(0, -col), self.cols - max(0, col)))
+            dst = (slice(max(0, row), self.rows + min(0, row)), slice(max(0, col), self.cols + min(0, col)))
+            edge = passable[src] & passable[dst]
+            sources.append(nodes[src][edge])
+            targets.append(nodes[dst][edge])
+        sources = numpy.concatenate(sources)
+        targets = numpy.concatenate(targets)
+
+        # stable so each node keeps its edges in _DIRECTIONS order
+        order = numpy.argsort(sources, kind='stable')
+        self.indices = targets[order]
+        self.weights = (1 + values.ravel()[self.indices]).astype(numpy.int32)
+        self.indptr = numpy.zeros(self.rows * self.cols + 1, numpy.int64)
+        numpy.cumsum(numpy.bincount(sources, minlength=self.rows * self.cols), out=self.indptr[1:])
+        self._lists = None
+
+    def node(self, row: int, col: int) -> int:
+        '''
+        returns the node id of the given row, col
+        '''
+        return row * self.cols + col
+
+    def position(self, node: int) -> tuple:
+        '''
+        returns the (row, col) of the given node id
+        '''
+        return divmod(node, self.cols)
+
+    def _as_lists(self) -> tuple:
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+        return self._lists
+
+    def neighbors(self, row: int, col: int) -> list:
+        '''
+        returns a list of the (row, col) neighbors reachable from row, col
+        '''
+        indptr, indices, _ = self._as_lists()
+        node = self.node(row, col)
+        return [divmod(i, self.cols) for i in indices[indptr[node]:indptr[node + 1]]]
+
+    def edges(self, row: int, col: int) -> list:
+        '''
+        returns a list of ((row, col), cost) for every edge leaving row, col
+        '''
+        indptr, indices, weights = self._as_lists()
+        node = self.node(row, col)
+        start, end = indptr[node], indptr[node + 1]
+        return [(divmod(i, self.cols), w) for i, w in zip(indices[start:end], weights[start:end])]
+
+
+_compiled = weakref.WeakKeyDictionary()
+
+def compile_board(board: Board) -> CompiledGraph:
+    '''
+    Returns the CompiledGraph of the board, reusing the last one compiled
+    until the board's version changes
+    '''
+    graph = _compiled.get(board)
+    if graph is None or graph.version != board.version:
+        graph = CompiledGraph(board)
+        _compiled[board] = graph
+    return graph
+
+
+if __name__ == '__main__':
+    board = Board(4, 5)
+    board[1, 1] = BoardOptions().wall
+    board[2, 3] = BoardOptions().w_path
+    graph = compile_board(board)
+    print(graph.indptr)
+    print(graph.indices)
+    print(graph.weights)
+    print(graph.edges(2, 2))
+    assert compile_board(board) is graph
+    board[0, 0] = BoardOptions().wall
+    assert compile_board(board) is not graph
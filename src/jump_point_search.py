@@ -0,0 +1,182 @@
+# .pathfinding/src/jump_point_search.py
+import heapq
+from .board import Board, BoardOptions
+from .errors import PathNotFound
+from . import components
+
+class JPS:
+    '''
+    Jump Point Search for boards where every step costs the same, uses the
+    4-connected moves of Astar.neighbors and finds paths of the same optimal
+    length as Astar.astar while only expanding jump points
+    '''
+
+    def __init__(self, board: Board, start: tuple, goal: tuple) -> None:
+        self._board = board
+        self.start = start
+        self.goal = goal
+        self.cost = None
+        self.expanded = 0
+
+    def _jump_horizontal(self, node: int, step: int) -> int:
+        '''
+        walks from node in the horizontal step (+-1) and returns the next
+        jump point, -1 if a wall is reached first
+        '''
+        cells, width, goal = self._cells, self._width, self._goal
+        while True:
+            node += step
+            if not cells[node]:
+                return -1
+            if node == goal:
+                return node
+            # a forced neighbor, above or below is open while behind it was not
+            if (cells[node - width] and not cells[node - width - step]) or \
+               (cells[node + width] and not cells[node + width - step]):
+                return node
+
+    def _jump_vertical(self, node: int, step: int) -> int:
+        '''
+        walks from node in the vertical step (+-width) and returns the next
+        jump point, -1 if a wall is reached first
+        '''
+        cells, goal = self._cells, self._goal
+        while True:
+            node += step
+            if not cells[node]:
+                return -1
+            if node == goal:
+                return node
+            if (cells[node - 1] and not cells[node - 1 - step]) or \
+               (cells[node + 1] and not cells[node + 1 - step]):
+                return node
+            # moving vertically a horizontal jump point makes this one too
+            if self._jump_horizontal(node, 1) != -1 or self._jump_horizontal(node, -1) != -1:
+                return node
+
+    def successors(self, node: int, parent: int) -> list:
+        '''
+        returns a list of the jump points reachable from node when it
+        was reached from parent
+        '''
+        cells, width = self._cells, self._width
+        if parent == -1:
+            directions = (-width, -1, 1, width)
+        elif abs(node - parent) < width:
+            step = 1 if node > parent else -1
+            directions = (-width, width, step)
+        else:
+            step = width if node > parent else -width
+            directions = (-1, 1, step)
+
+        jump_points = []
+        for step in directions:
+            if not cells[node + step]:
+                continue
+            if step in (-1, 1):
+                jump_point = self._jump_horizontal(node, step)
+            else:
+                jump_point = self._jump_vertical(node, step)
+            if jump_point != -1:
+                jump_points.append(jump_point)
+        return jump_points
+
+    def reconstruct_path(self, came_from: dict, current: int) -> list:
+        '''
+        Given a dictionary of jump points and the goal returns the ordered
+        list of (row, col) from start to goal with the straight runs
+        between jump points filled in
+        '''
+        jump_points = [current]
+        while current in came_from:
+            current = came_from[current]
+            jump_points.append(current)
+        jump_points.reverse()
+
+        total_path = [jump_points[0]]
+        for a, b in zip(jump_points, jump_points[1:]):
+            step = (1 if b > a else -1) if abs(b - a) < self._width else (self._width if b > a else -self._width)
+            total_path.extend(range(a + step, b + step, step))
+        return [self._passability.position(i) for i in total_path]
+
+    def search(self) -> list:
+        '''
+        Runs jump point search without touching the board and returns
+        the ordered path from start to goal
+        '''
+        assert self._board.is_valid_pos(self.start), f"JPS.search: invalid start '{self.start}'"
+        assert self._board.is_valid_pos(self.goal), f"JPS.search: invalid goal '{self.goal}'"
+        if not components.connected(self._board, self.start, self.goal):
+            raise PathNotFound
+        self._passability = self._board.passability()
+        self._cells = self._passability.cells.tolist()
+        self._width = width = self._passability.stride
+        start = self._passability.index(*self.start)
+        self._goal = goal = self._passability.index(*self.goal)
+        goal_row, goal_col = divmod(goal, width)
+
+        came_from = {}
+        g_score = {start: 0}
+        closed = set()
+        # ties on f are broken towards the goal
+        open_set = [(0, 0, start)]
+        expanded = 0
+
+        while open_set:
+            current = heapq.heappop(open_set)[2]
+            if current in closed:
+                continue
+            closed.add(current)
+            expanded += 1
+            if current == goal:
+                self.expanded = expanded
+                path = self.reconstruct_path(came_from, current)
+                self.cost = sum(1 + int(self._board[cell]) for cell in path[1:])
+                return path
+            for jump_point in self.successors(current, came_from.get(current, -1)):
+                if jump_point in closed:
+                    continue
+                # jump points are always in a straight line from current
+                distance = abs(jump_point - current)
+                if distance >= width:
+                    distance //= width
+                tentative_g = g_score[current] + distance
+                row, col = divmod(jump_point, width)
+                if tentative_g < g_score.get(jump_point, tentative_g + 1):
+                    g_score[jump_point] = tentative_g
+                    came_from[jump_point] = current
+                    h = abs(row - goal_row) + abs(col - goal_col)
+                    heapq.heappush(open_set, (tentative_g + h, h, jump_point))
+
+        self.expanded = expanded
+        raise PathNotFound
+
+    def jps(self) -> set:
+        '''
+        Jump point search pathfinding algorithm on the grid given, finds
+        the optimal path and marks it on the board the same way Astar.astar does
+        '''
+        path = self.search()
+        for cell in path[:-1]:
+            if self._board[cell] == BoardOptions().path:
+                self._board[cell] = BoardOptions().route
+        return set(path)
+
+
+if __name__ == '__main__':
+    # node expansions against FastAstar on open boards
+    import random
+    from .fast_astar import FastAstar
+
+    random.seed(0)
+    for walls in (0, 400, 4000):
+        board = Board(200, 200)
+        for _ in range(walls):
+            board[random.randrange(200), random.randrange(200)] = BoardOptions().wall
+        board[0, 0] = board[199, 199] = BoardOptions().path
+        jps = JPS(board, (0, 0), (199, 199))
+        jps.search()
+        astar = FastAstar(board, (0, 0), (199, 199))
+        astar.search()
+        print(f'{walls} walls: JPS cost {jps.cost} expanded {jps.expanded}, '
+              f'FastAstar cost {astar.cost} expanded {astar.expanded}')
@@ -0,0 +1,85 @@
+# .pathfinding/src/path_cache.py
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy
+from .board import Board
+from .errors import PathNotFound
+from .result import search
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    nbytes: int = 0
+
+
+def run_search(algorithm, board: Board, start: tuple, goal: tuple):
+    '''
+    Runs a search class and returns the (N, 2) array of its ordered
+    path, the board is left untouched
+    '''
+    return search(algorithm, board, start, goal).path
+
+
+class PathCache:
+    '''
+    LRU cache of finished paths keyed on the algorithm, start, goal and
+    the board's version, bounded by entry count and by the bytes of the
+    stored (N, 2) coordinate arrays. Queries without a path are cached too
+    '''
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._paths = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def clear(self) -> None:
+        self._paths.clear()
+        self.stats.entries = self.stats.nbytes = 0
+
+    def _store(self, key: tuple, path) -> None:
+        if key in self._paths:
+            return
+        self._paths[key] = path
+        self.stats.entries += 1
+        self.stats.nbytes += 0 if path is None else path.nbytes
+        while len(self._paths) > self.max_entries or self.stats.nbytes > self.max_bytes:
+            evicted = self._paths.popitem(last=False)[1]
+            self.stats.evictions += 1
+            self.stats.entries -= 1
+            self.stats.nbytes -= 0 if evicted is None else evicted.nbytes
+
+    def find(self, board: Board, algorithm, start: tuple, goal: tuple):
+        '''
+        Returns the read-only (N, 2) array of the ordered path from start
+        to goal found by algorithm, raises PathNotFound if there is none
+        '''
+        key = (algorithm, start, goal, board.version)
+        if key in self._paths:
+            self.stats.hits += 1
+            self._paths.move_to_end(key)
+            path = self._paths[key]
+            if path is None:
+                raise PathNotFound
+            return path
+
+        self.stats.misses += 1
+        try:
+            path = run_search(algorithm, board, start, goal)
+        except PathNotFound:
+            self._store(key, None)
+            raise
+        dtype = numpy.int16 if max(board.size()) <= numpy.iinfo(numpy.int16).max else numpy.int32
+        path = numpy.array(path, dtype).reshape(-1, 2)
+        path.flags.writeable = False
+        self._store(key, path)
+        return path
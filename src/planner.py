@@ -0,0 +1,51 @@
+# .pathfinding/src/planner.py
+import weakref
+import numpy
+from .board import Board, BoardOptions
+from .fast_astar import FastAstar
+from .jump_point_search import JPS
+from .bucket_astar import BucketAstar, MAX_BUCKET_COST, max_step_cost
+
+_facts = weakref.WeakKeyDictionary()
+
+def board_facts(board: Board) -> tuple:
+    '''
+    Returns (weighted, max_cost), the number of passable cells that are
+    not plain paths and the largest step cost, reused until the board's
+    version changes so each query doesn't scan the whole board
+    '''
+    cached = _facts.get(board)
+    if cached is None or cached[0] != board.version:
+        values = board.view()
+        weighted = int(numpy.count_nonzero((values != BoardOptions().path) & (values != BoardOptions().wall)))
+        cached = (board.version, weighted, max_step_cost(board))
+        _facts[board] = cached
+    return cached[1:]
+
+def is_uniform(board: Board, start: tuple, goal: tuple) -> bool:
+    '''
+    Returns true if every passable cell other than start and goal is a
+    plain path, so every step Astar.astar takes costs the same
+    '''
+    weighted = board_facts(board)[0]
+    for cell in {start, goal}:
+        if board.view()[cell] not in (BoardOptions().path, BoardOptions().wall):
+            weighted -= 1
+    return weighted == 0
+
+def choose_engine(board: Board, start: tuple, goal: tuple):
+    '''
+    Returns the search class best suited to the board, JPS on uniform
+    boards, BucketAstar when every step costs at most MAX_BUCKET_COST
+    and FastAstar otherwise
+    '''
+    if is_uniform(board, start, goal):
+        return JPS
+    return BucketAstar if board_facts(board)[1] <= MAX_BUCKET_COST else FastAstar
+
+def find_path(board: Board, start: tuple, goal: tuple) -> list:
+    '''
+    Returns the ordered optimal path from start to goal without touching
+    the board, raises PathNotFound if there is none
+    '''
+    return choose_engine(board, start, goal)(board, start, goal).search()
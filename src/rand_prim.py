@@ -2,6 +2,8 @@
 
 import random
 from .board import Board, BoardOptions
+from .steps import changed
+from . import stats as instrument
 
 DEFAULT_MULT = 10
 
@@ -78,24 +80,51 @@ class RandomPrim:
         Performs a Randomized Prim's algorithm on the maze grid
         running until it has no more valid walls
         '''
+        for _ in self.steps(self.multiplier if self.visual != None else 0):
+            self.visual()
+
+    def steps(self, batch: int = DEFAULT_MULT):
+        '''
+        Randomized Prim's algorithm as a generator yielding an (N, 2) array
+        of the cells carved every batch passages, batch 0 yields nothing
+        '''
+        stats = instrument.begin(self)
+        popped = set()
         start_cell = (random.randint(1, self._board.size()[0]-2), 0)
         self._board[start_cell] = BoardOptions().path
         self.add_neighboring_walls(*start_cell)
 
-        count = 0
+        carved = [start_cell] if batch else None
 
         while self.walls:
             rand_wall = self.walls.pop(random.randrange(len(self.walls)))
+            if stats is not None:
+                stats.pops += 1
+                # walls are queued once per neighboring passage
+                if rand_wall in popped:
+                    stats.duplicate_pushes += 1
+                popped.add(rand_wall)
             if self.num_visited(*rand_wall) == 1:
                 if unvisited_cell := self.passage(*rand_wall):
                     self._board[rand_wall] = BoardOptions().path
                     self._board[unvisited_cell] = BoardOptions().path
+                    if stats is not None:
+                        stats.expanded += 1
     
-                    if count % self.multiplier == 0 and self.visual != None:
-                        self.visual()
-                        count = 0
-                    count += 1
+                    if batch:
+                        carved.append(rand_wall)
+                        carved.append(unvisited_cell)
+                        if len(carved) >= 2 * batch:
+                            yield changed(carved)
+                            carved = []
                     self.add_neighboring_walls(*unvisited_cell)
+        if carved:
+            yield changed(carved)
+        if stats is not None:
+            # every queued wall is popped by the end
+            stats.pushes = stats.neighbors = stats.pops
+            instrument.lap(stats, 'generate')
+            instrument.end(stats)
             
 
 
@@ -4,6 +4,8 @@
 from collections import deque
 import random
 from .board import Board, BoardOptions
+from .steps import changed
+from . import stats as instrument
 
 DEFAULT_MULT = 10
 
@@ -67,21 +69,43 @@ class RandomDepthFirst:
         Performs a Randomized Depth First algorithm on the maze grid
         running until it has no more valid walls
         '''
+        for _ in self.steps(self.multiplier if self.visual != None else 0):
+            self.visual()
+
+    def steps(self, batch: int = DEFAULT_MULT):
+        '''
+        Randomized Depth First as a generator yielding an (N, 2) array
+        of the cells carved every batch cells, batch 0 yields nothing
+        '''
+        stats = instrument.begin(self)
         start_cell = (random.randint(1, self._board.size()[0]-2), 0)
         self._board[start_cell] = BoardOptions().path
         self.stack.append(start_cell)
-        count = 0
+        carved = [start_cell] if batch else None
         while self.stack:
             cell = self.stack.pop()
+            if stats is not None:
+                stats.pops += 1
             if unvisited_cell := self.get_random_neighbor(*cell):
                 self.stack.append(cell)
                 self._board[unvisited_cell] = BoardOptions().path
-
-                if count % self.multiplier == 0 and self.visual != None:
-                    self.visual()
-                    count = 0
-                count += 1
+                if stats is not None:
+                    stats.expanded += 1
+
+                if batch:
+                    carved.append(unvisited_cell)
+                    if len(carved) >= batch:
+                        yield changed(carved)
+                        carved = []
                 self.stack.append(unvisited_cell)
+        if carved:
+            yield changed(carved)
+        if stats is not None:
+            # the stack is empty by the end, the carved cells are the neighbors picked
+            stats.pushes = stats.pops
+            stats.neighbors = stats.expanded
+            instrument.lap(stats, 'generate')
+            instrument.end(stats)
             
 
 
@@ -0,0 +1,43 @@
+# .pathfinding/src/result.py
+from dataclasses import dataclass
+import numpy
+from .board import Board
+
+@dataclass
+class SearchResult:
+    '''
+    A finished search, path is the ordered (N, 2) int32 array of
+    (row, col) from start to goal and cost what Astar.astar charges
+    for it, moving onto a cell costs 1 + board[cell]
+    '''
+    algorithm: str
+    path: numpy.ndarray
+    cost: int
+    expanded: int = None
+
+    @classmethod
+    def from_path(cls, board: Board, path: list, algorithm: str, expanded: int = None):
+        '''
+        returns the result of an ordered list of (row, col) on board
+        '''
+        path = numpy.array(path, numpy.int32).reshape(-1, 2)
+        path.flags.writeable = False
+        values = board.view()
+        cost = int(values[path[1:, 0], path[1:, 1]].astype(numpy.int64).sum()) + len(path) - 1
+        return cls(algorithm, path, cost, expanded)
+
+    def __len__(self) -> int:
+        return len(self.path)
+
+
+def search(algorithm, board: Board, start: tuple, goal: tuple) -> SearchResult:
+    '''
+    Runs a search class without touching the board and returns its
+    SearchResult, raises PathNotFound if there is no path
+    '''
+    engine = algorithm(board, start, goal)
+    if hasattr(engine, 'solve'):
+        return engine.solve()
+    if hasattr(engine, 'search'):
+        return SearchResult.from_path(board, engine.search(), algorithm.__name__, getattr(engine, 'expanded', None))
+    raise TypeError(f"search: unsupported algorithm '{algorithm}'")
@@ -0,0 +1,251 @@
+# .pathfinding/src/service.py
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+import numpy
+from .board import Board
+from .batch import BatchPlanner
+from .errors import PathNotFound
+
+DEFAULT_BATCH_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 256
+# latencies kept for the percentiles
+LATENCY_SAMPLES = 10000
+
+
+class PathService:
+    '''
+    Answers path queries against one board from an asyncio event loop.
+    Queries arriving within batch_window of each other are solved as one
+    BatchPlanner job on a worker thread so the loop never blocks, and a
+    query identical to one already in flight waits for that one's answer.
+    The board must not change while the service runs
+    '''
+
+    def __init__(self, board: Board, workers: int = None, engine = None,
+                 batch_window: float = DEFAULT_BATCH_WINDOW, max_batch: int = DEFAULT_MAX_BATCH) -> None:
+        self._board = board
+        self.workers = workers or os.cpu_count()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._planner = BatchPlanner(board, self.workers, engine)
+        self._pending = {}
+        self._queue = None
+        self._batcher = None
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched = 0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        '''
+        starts the worker pool and the batching task
+        '''
+        await asyncio.get_running_loop().run_in_executor(None, self._planner.start)
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batches())
+
+    async def close(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        await asyncio.get_running_loop().run_in_executor(None, self._planner.close)
+
+    def _is_position(self, cell) -> bool:
+        '''
+        true if cell is a (row, col) of two plain ints on the board, queries
+        come from the network so the board's asserts are not relied on
+        '''
+        return type(cell) is tuple and len(cell) == 2 and all(type(i) is int for i in cell) \
+            and 0 <= cell[0] < self._board.rows and 0 <= cell[1] < self._board.cols
+
+    async def query(self, start: tuple, goal: tuple):
+        '''
+        Returns the (N, 2) int32 array of the ordered path from start to
+        goal, raises PathNotFound if there is none
+        '''
+        assert self._batcher is not None, 'PathService.query: service is not started'
+        if not self._is_position(start) or not self._is_position(goal):
+            raise ValueError(f'PathService.query: invalid query {start} -> {goal}')
+        t = time.perf_counter()
+        self.requests += 1
+        key = (start, goal)
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            self._queue.put_nowait(key)
+        else:
+            self.coalesced += 1
+        try:
+            # shielded so a cancelled caller doesn't cancel the shared answer
+            return await asyncio.shield(future)
+        finally:
+            self._latencies.append(time.perf_counter() - t)
+
+    async def _run_batches(self) -> None:
+        '''
+        collects the queued queries for batch_window and solves them as
+        one job, queries queued meanwhile go in the next one
+        '''
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            pairs = [(*start, *goal) for start, goal in batch]
+            chunksize = math.ceil(len(pairs) / self.workers)
+            self.batches += 1
+            self.batched += len(batch)
+            try:
+                paths = await loop.run_in_executor(None, self._planner.solve, pairs, chunksize)
+            except Exception:
+                # solved one by one so a failing query only fails itself
+                paths = [await self._solve_one(loop, pair) for pair in pairs]
+            for key, path in zip(batch, paths):
+                future = self._pending.pop(key)
+                if future.cancelled():
+                    continue
+                if path is None:
+                    future.set_exception(PathNotFound())
+                elif isinstance(path, Exception):
+                    future.set_exception(path)
+                else:
+                    future.set_result(path)
+
+    async def _solve_one(self, loop, pair: tuple):
+        '''
+        returns the path of one query, None without a path or the error raised
+        '''
+        try:
+            return (await loop.run_in_executor(None, self._planner.solve, [pair], 1))[0]
+        except Exception as error:
+            return error
+
+    def stats(self) -> dict:
+        '''
+        Returns the request counters, the queries waiting for a batch
+        (queue_depth), those unanswered (in_flight) and latency percentiles
+        in milliseconds
+        '''
+        stats = dict(requests=self.requests, coalesced=self.coalesced, batches=self.batches,
+                     mean_batch=self.batched / self.batches if self.batches else 0.0,
+                     queue_depth=self._queue.qsize() if self._queue is not None else 0,
+                     in_flight=len(self._pending))
+        latencies = numpy.array(self._latencies) * 1000
+        for percentile in (50, 90, 99):
+            stats[f'p{percentile}_ms'] = float(numpy.percentile(latencies, percentile)) if len(latencies) else None
+        return stats
+
+    async def handle(self, reader, writer) -> None:
+        '''
+        Serves one connection of the JSON lines protocol, every line is
+            {"id": 1, "start": [row, col], "goal": [row, col]}
+            {"id": 2, "op": "stats"}
+        and is answered with a line holding the same id and "path", "stats"
+        or "error". Answers come back as they finish, not in request order
+        '''
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    async def _answer(self, line: bytes, writer) -> None:
+        response = {}
+        try:
+            message = json.loads(line)
+            response['id'] = message.get('id')
+            if message.get('op') == 'stats':
+                response['stats'] = self.stats()
+            else:
+                path = await self.query(tuple(message['start']), tuple(message['goal']))
+                response['path'] = path.tolist()
+        except PathNotFound:
+            response['error'] = 'PathNotFound'
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            response['error'] = f'invalid request: {error}'
+        except Exception as error:
+            # every line gets an answer, the client would wait forever otherwise
+            response['error'] = f'{type(error).__name__}: {error}'
+        if writer.is_closing():
+            return
+        writer.write(json.dumps(response).encode() + b'\n')
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+async def serve(service: PathService, path: str = None, host: str = '127.0.0.1', port: int = 8765):
+    '''
+    Returns the started asyncio server of service on the Unix socket
+    path, or on host and port when path is None
+    '''
+    if path is not None:
+        return await asyncio.start_unix_server(service.handle, path)
+    return await asyncio.start_server(service.handle, host, port)
+
+
+if __name__ == '__main__':
+    import argparse
+    from .board_io import load_board
+    from .fast_astar import FastAstar
+    from .bucket_astar import BucketAstar
+    from .jump_point_search import JPS
+    from .wavefront_bfs import WavefrontBFS
+
+    ENGINES = {'FastAstar': FastAstar, 'BucketAstar': BucketAstar, 'JPS': JPS, 'WavefrontBFS': WavefrontBFS}
+
+    parser = argparse.ArgumentParser(description='serve path queries on a board over a JSON lines socket')
+    parser.add_argument('board', help='a board saved with save_board or a .npy board')
+    parser.add_argument('--border', action='store_true', help='the .npy board includes its border')
+    parser.add_argument('--socket', help='Unix socket path, localhost TCP otherwise')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--engine', choices=ENGINES, default=None, help='by default find_path picks per query')
+    parser.add_argument('--batch-window', type=float, default=DEFAULT_BATCH_WINDOW)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    args = parser.parse_args()
+
+    async def main():
+        if args.board.endswith('.npy'):
+            board = Board.open_memmap(args.board, args.border, mode='r')
+        else:
+            board = load_board(args.board)
+        async with PathService(board, args.workers, ENGINES.get(args.engine),
+                               args.batch_window, args.max_batch) as service:
+            server = await serve(service, args.socket, args.host, args.port)
+            print(f'serving {board!r} on {args.socket or f"{args.host}:{args.port}"}')
+            async with server:
+                await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
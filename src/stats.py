@@ -0,0 +1,150 @@
+# .pathfinding/src/stats.py
+import time
+from dataclasses import dataclass, field, fields
+
+# callables receiving the Stats of every finished instrumented run
+_sinks = []
+
+@dataclass
+class Stats:
+    '''
+    Counters of one run of Astar, BFS, DFS, RandomPrim or RandomDepthFirst,
+    timings maps a phase ('search', 'reconstruct_path', 'generate') to seconds
+    '''
+    algorithm: str = ''
+    expanded: int = 0
+    neighbors: int = 0
+    pushes: int = 0
+    pops: int = 0
+    duplicate_pushes: int = 0
+    board_reads: int = 0
+    board_writes: int = 0
+    timings: dict = field(default_factory=dict)
+
+    def __add__(self, other):
+        total = Stats(self.algorithm if self.algorithm == other.algorithm else '')
+        for counter in fields(Stats)[1:-1]:
+            setattr(total, counter.name, getattr(self, counter.name) + getattr(other, counter.name))
+        for timings in (self.timings, other.timings):
+            for phase, seconds in timings.items():
+                total.timings[phase] = total.timings.get(phase, 0.0) + seconds
+        return total
+
+
+class CountingBoard:
+    '''
+    Stands in for the board of an instrumented run counting the cells
+    read and written through indexing, everything else goes to the board
+    '''
+
+    def __init__(self, board, stats: Stats) -> None:
+        self._wrapped = board
+        self._stats = stats
+
+    def __getitem__(self, index):
+        self._stats.board_reads += 1
+        return self._wrapped[index]
+
+    def __setitem__(self, index, val):
+        self._stats.board_writes += 1
+        self._wrapped[index] = val
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+
+def add_sink(callback) -> None:
+    '''
+    Calls callback(stats) after every instrumented run until
+    remove_sink, runs are only instrumented while a sink is added
+    '''
+    _sinks.append(callback)
+
+def remove_sink(callback) -> None:
+    _sinks.remove(callback)
+
+def begin(engine):
+    '''
+    starts instrumenting a run of engine, returns its Stats or None when
+    no sink is listening. The engine's board is swapped for a CountingBoard
+    until end
+    '''
+    board = engine._board
+    if isinstance(board, CountingBoard):
+        # a run abandoned before end, its counters are left as they were
+        board = engine._board = board._wrapped
+    if not _sinks:
+        return None
+    stats = Stats(type(engine).__name__)
+    engine._board = CountingBoard(board, stats)
+    stats._engine = engine
+    stats._lap = time.perf_counter()
+    return stats
+
+def lap(stats: Stats, phase: str) -> None:
+    '''
+    adds the time since the last lap to phase
+    '''
+    now = time.perf_counter()
+    stats.timings[phase] = stats.timings.get(phase, 0.0) + now - stats._lap
+    stats._lap = now
+
+def end(stats: Stats) -> None:
+    '''
+    hands a finished run to the sinks and gives the engine its board back
+    '''
+    engine = stats.__dict__.pop('_engine', None)
+    if engine is not None and isinstance(engine._board, CountingBoard):
+        engine._board = engine._board._wrapped
+    for sink in list(_sinks):
+        sink(stats)
+
+
+class collect:
+    '''
+    Context manager collecting the Stats of the runs inside it
+        with collect() as collector:
+            Astar(board, start, goal).astar()
+        collector.runs[0].expanded, collector.total().board_reads
+    '''
+
+    def __init__(self) -> None:
+        self.runs = []
+
+    def __enter__(self):
+        add_sink(self.runs.append)
+        return self
+
+    def __exit__(self, *args) -> None:
+        remove_sink(self.runs.append)
+
+    def total(self) -> Stats:
+        '''
+        returns the sum of the collected runs
+        '''
+        total = Stats()
+        for stats in self.runs:
+            total = total + stats
+        return total
+
+
+if __name__ == '__main__':
+    # one engine run twice, each run counts only itself and the board comes back
+    from .board import Board
+    from .astar_main import Astar
+    # run as __main__ this module is a second copy, the searches report to src.stats
+    from . import stats as instrument
+
+    board = Board(20, 20)
+    engine = Astar(board, (0, 0), (19, 19))
+    with instrument.collect() as collector:
+        engine.astar()
+        first = collector.runs[0].board_reads
+        assert engine._board is board, 'the engine keeps a CountingBoard after end'
+        engine.astar()
+    assert collector.runs[0].board_reads == first, 'the second run counted into the first'
+    assert collector.runs[1].board_reads > 0
+    engine.astar()
+    assert collector.runs[0].board_reads == first and engine._board is board
+    print(collector.runs[0])
+    print(collector.runs[1])
@@ -0,0 +1,56 @@
+# .pathfinding/src/steps.py
+import time
+import numpy
+
+# work units, expansions or carves, between two yields of a steps() generator
+DEFAULT_BATCH = 64
+
+def changed(cells: list):
+    '''
+    returns a list of (row, col) as the (N, 2) int32 array steps() yield
+    '''
+    return numpy.array(cells, numpy.int32).reshape(-1, 2)
+
+def run(steps):
+    '''
+    Runs a steps() generator to the end and returns its result
+    '''
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+class Stepper:
+    '''
+    Advances a steps() generator a time budget at a time, for callers
+    that interleave an algorithm with drawing frames
+    '''
+
+    def __init__(self, steps) -> None:
+        self._steps = steps
+        self.done = False
+        self.result = None
+        self.error = None
+
+    def advance(self, budget: float) -> list:
+        '''
+        Runs steps for about budget seconds, returns the batches of
+        changed cells yielded. An exception raised by the algorithm is
+        kept in self.error and ends the run
+        '''
+        batches = []
+        deadline = time.perf_counter() + budget
+        while not self.done:
+            try:
+                batches.append(next(self._steps))
+            except StopIteration as done:
+                self.done = True
+                self.result = done.value
+            except Exception as error:
+                self.done = True
+                self.error = error
+            if time.perf_counter() >= deadline:
+                break
+        return batches
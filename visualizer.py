@@ -3,6 +3,8 @@
 import pygame
 from src import *
 from settings import settings
+from renderer import Renderer
+from src.steps import Stepper
 
 _INITIAL_WIDTH, _INITIAL_HEIGHT = 420, 470
 
@@ -37,6 +39,8 @@ class Visualizer:
         self._single_click = False
 
         self._selected_path = BD.wall
+        self._path_cache = PathCache()
+        self._renderer = Renderer(self._board, COLORS)
 
     def run(self) -> None:
         pygame.init()
@@ -76,8 +80,10 @@ class Visualizer:
         if event.key == pygame.K_2 and (mods & pygame.KMOD_LSHIFT):
             self._run_rdf()
         if event.key == pygame.K_c:
+            self._renderer.clear_overlays()
             self._board.reset()
         if event.key == pygame.K_f:
+            self._renderer.clear_overlays()
             self._board.fill(self._selected_path)
         if event.key == pygame.K_t:
             #testing block
@@ -100,60 +106,74 @@ class Visualizer:
         self._draw_frame()
     
     def _run_rdf(self) -> None:
+        self._renderer.clear_overlays()
         self._board.reset()
-        RandomDepthFirst(self._board, self._visualizer, multiplier=settings['multiplier']).depth()
+        self._animate(RandomDepthFirst(self._board).steps(settings['multiplier']))
 
     def _run_prim(self) -> None:
+        self._renderer.clear_overlays()
         self._board.reset()
-        RandomPrim(self._board, self._visualizer, multiplier=settings['multiplier']).prims()
+        self._animate(RandomPrim(self._board).steps(settings['multiplier']))
+
+    def _animate(self, steps):
+        '''
+        advances an algorithm's steps for the step budget every frame
+        at a capped frame rate, returns the algorithm's result
+        '''
+        stepper = Stepper(steps)
+        clock = pygame.time.Clock()
+        while self._running and not stepper.done:
+            self._handle_events()
+            stepper.advance(settings['step_budget'])
+            self._draw_frame()
+            clock.tick(settings['fps'])
+        if stepper.error is not None:
+            raise stepper.error
+        return stepper.result
 
     def _run_astar(self) -> None:
         '''
         runs astar pathfinding algorithm on the current
-        board state updating the board with the found
-        route
+        board state showing the found route over the board
         '''
-        self._board.replace(BD.route, BD.path)
-        self._board.replace(BD.start_end, BD.path)
         start, end = self._get_start_end()
-        try:
-            Astar(self._board, start, end).astar()
-        except PathNotFound:
-            self._path_not_found()
+        self._find_path(Astar, start, end)
 
     def _run_dfs(self) -> None:
         '''
         runs depth first search pathfinding algorithm on the 
-        current board state updating the baord with the found
-        route
+        current board state showing the found route over the board
         '''
-        self._board.replace(BD.route, BD.path)
-        self._board.replace(BD.start_end, BD.path)
         start, end = self._get_start_end()
-        try:
-            DFS(self._board, start, end).dfs()
-        except PathNotFound:
-            self._path_not_found()
+        self._find_path(DFS, start, end)
     
     def _run_bfs(self) -> None:
         '''
         runs breadth first search pathfinding algorithm on the 
-        current board state updating the baord with the found
-        route
+        current board state showing the found route over the board
         '''
-        self._board.replace(BD.route, BD.path)
-        self._board.replace(BD.start_end, BD.path)
         start, end = self._get_start_end()
+        self._find_path(BFS, start, end)
+
+    def _find_path(self, algorithm, start: tuple, end: tuple) -> None:
+        '''
+        finds the route with the given algorithm through the path cache
+        and shows it as an overlay, the board is left untouched so the
+        same query on an unchanged board is a cache hit
+        '''
         try:
-            BFS(self._board, start, end).bfs()
+            path = self._path_cache.find(self._board, algorithm, start, end)
         except PathNotFound:
             self._path_not_found()
+            return
+        self._renderer.set_overlay('route', path[1:-1], BD.route)
 
     def _path_not_found(self) -> None:
         self._surface.fill(_WARNING_COLOR)
         pygame.display.update()
 
     def _get_start_end(self) -> list[tuple]:
+        self._renderer.clear_overlays()
         start_end = []
         while len(start_end) < 2:
             for event in pygame.event.get():
@@ -164,8 +184,8 @@ class Visualizer:
                     coordinate = self._get_coordinates_at_pixel(event.pos)
                     if coordinate not in start_end and self._board.is_valid_pos(coordinate) \
                     and self._board[coordinate] != BD.wall:
-                        self._board[coordinate] = BD.start_end
                         start_end.append(coordinate)
+                        self._renderer.set_overlay('start_end', start_end, BD.start_end)
                         self._draw_frame()
         return start_end
         
@@ -177,6 +197,7 @@ class Visualizer:
         self._surface.fill(_BACKGROUND_COLOR)
         self._draw_grid()
         pygame.display.update()
+        self._renderer.tick()
     
     def _redraw_game_window(self) -> None:
         self._surface.fill(_BACKGROUND_COLOR)
@@ -186,20 +207,7 @@ class Visualizer:
         '''
         Draws the entire game board in grids
         '''
-        iterator = self._board.__iterall__()
-        for row, col, val in iterator:
-            self._draw_box(row, col, COLORS[val])
-
-    def _draw_box(self, row: int, col: int, color) -> pygame.Rect:
-        '''
-        Draws a pygame rect at the given row, col with given color, 
-        returns the rect object
-        '''
-        left = self._grid_size()[1] * col
-        top = self._grid_size()[0] * row
-        rect = pygame.Rect(left, top, self._grid_size()[1], self._grid_size()[0])
-        pygame.draw.rect(self._surface, color, rect)
-        return rect
+        self._renderer.draw(self._surface, (self._field_width(), self._field_height()))
     
     def _draw_wall(self):
         '''